@@ -0,0 +1,75 @@
+"""Compare decoding a large getSchedule/getVods payload with the full json decode (what ``response.json()`` does)
+against the schema decoder of :mod:`utils.schemas`, measuring the decode time and the peak and retained memory.
+
+Run from the repository root: ``python benchmarks/bench_decode.py [events]``
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils.schemas as schemas
+
+
+def make_event(index: int) -> dict:
+    """Build an event shaped like the upstream payload, including the fields the bot never reads"""
+    locales = ['en-US', 'ko-KR', 'zh-CN', 'fr-FR', 'de-DE', 'es-ES', 'pt-BR', 'vi-VN']
+    vods = [{
+        'id': f'{index}{n}', 'parameter': f'vod{index}{n}', 'locale': locale, 'provider': 'youtube',
+        'offset': 0, 'firstFrameTime': '2023-10-10T08:00:00Z', 'startMillis': 1000 * n, 'endMillis': 9000 * n,
+        'mediaLocale': {'locale': locale, 'englishName': locale, 'translatedName': locale},
+    } for n, locale in enumerate(locales)]
+    return {
+        'startTime': '2023-10-10T08:00:00Z',
+        'state': 'completed',
+        'type': 'match',
+        'blockName': 'Swiss Stage',
+        'league': {'id': '98767975604431411', 'name': 'Worlds', 'slug': 'worlds', 'image': 'http://static.lolesports.com/leagues/1592594612171_WorldsDarkBG.png', 'priority': 208},
+        'tournament': {'id': '110851011414014925', 'slug': 'worlds_2023'},
+        'match': {
+            'id': str(110853020184706765 + index),
+            'flags': ['hasVod', 'isSpoiler'],
+            'teams': [{
+                'id': str(98767991853197861 + side), 'name': f'Team {side}', 'code': f'T{side}', 'slug': f'team-{side}',
+                'image': 'http://static.lolesports.com/teams/1631819669150_fnc-2021-worlds.png',
+                'result': {'outcome': 'win' if side == 0 else 'loss', 'gameWins': 2 - side},
+                'record': {'wins': 3, 'losses': 1},
+            } for side in range(2)],
+            'strategy': {'type': 'bestOf', 'count': 3},
+        },
+        'games': [{'id': f'{index}{n}', 'number': n + 1, 'state': 'completed', 'vods': vods} for n in range(3)],
+    }
+
+
+def measure(decode, body: bytes, repeat: int = 5) -> tuple:
+    """Get the best decode time, the peak memory while decoding and the memory retained by the result"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(body)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    result = decode(body)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak, retained
+
+
+def main(events: int = 2000) -> None:
+    body = json.dumps({'data': {'schedule': {'pages': {'older': 'b2xkZXI=', 'newer': None},
+                                             'events': [make_event(i) for i in range(events)]}}}).encode()
+    print(f'payload: {events} events, {len(body) / 1024 / 1024:.1f} MiB')
+    candidates = {
+        'response.json()': lambda raw: json.loads(raw.decode('utf-8')),
+        'schemas.decode': lambda raw: schemas.decode('getVods', raw),
+    }
+    for name, decode in candidates.items():
+        seconds, peak, retained = measure(decode, body)
+        print(f'{name:>16}: {seconds * 1000:8.1f} ms   peak {peak / 1024 / 1024:7.1f} MiB   retained {retained / 1024 / 1024:7.1f} MiB')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,93 @@
+"""Compare the per-event cost of formatting the start time of a schedule when every formatter parses the raw
+``startTime`` string again (strptime and pytz zones built on every call, fromisoformat for the time deltas) against
+parsing it once in :meth:`utils.lolesports.Event.from_dict` and formatting the stored datetime.
+
+Run from the repository root: ``python benchmarks/bench_timestamps.py [events]``
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils.lolesports as lol
+from cogs.query import Query
+
+
+def make_event(index: int) -> dict:
+    """Build a schedule event starting ``index`` hours after the first one"""
+    start = datetime(2023, 10, 10, 8, tzinfo=timezone.utc) + timedelta(hours=index)
+    return {
+        'startTime': start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'state': 'unstarted',
+        'type': 'match',
+        'blockName': 'Week 1',
+        'league': {'name': 'LCK', 'slug': 'lck'},
+        'match': {
+            'id': str(110853020184706765 + index),
+            'teams': [{'name': f'Team {side}', 'code': f'T{side}', 'image': None,
+                       'result': {'outcome': None, 'gameWins': 0}, 'record': {'wins': 0, 'losses': 0}}
+                      for side in range(2)],
+            'strategy': {'type': 'bestOf', 'count': 3},
+        },
+    }
+
+
+def old_convert_timezone(time_str: str, tz: str = 'US/Pacific') -> str:
+    """The previous formatter, parsing the string and building the zones on every call"""
+    for time_format in ('%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S.%fZ'):
+        try:
+            utc_time = datetime.strptime(time_str, time_format)
+            break
+        except ValueError:
+            continue
+    else:
+        return 'Invalid time format'
+    utc_time = pytz.timezone('UTC').localize(utc_time)
+    return utc_time.astimezone(pytz.timezone(tz)).strftime('%m/%d/%y, %a %I:%M %p')
+
+
+def old_time_delta(time_str: str) -> timedelta:
+    return datetime.fromisoformat(time_str.replace('Z', '+00:00')) - datetime.now(timezone.utc)
+
+
+def old_schedule(raw_events: list) -> None:
+    """Format a schedule the old way: the string is parsed by every formatter of every event"""
+    now = datetime.utcnow()
+    min(raw_events, key=lambda event: abs((datetime.fromisoformat(event['startTime'][:-1]) - now).total_seconds()))
+    for event in raw_events:
+        old_time_delta(event['startTime'])
+        old_convert_timezone(event['startTime'])
+
+
+def new_schedule(raw_events: list) -> None:
+    """Format a schedule the new way: parsed once into an event, then formatted from the stored datetime"""
+    events = [lol.Event.from_dict(event) for event in raw_events]
+    Query.find_closest_match_index(events)
+    for event in events:
+        Query.convert_timedelta(event.start)
+        Query.convert_timezone(event.start)
+
+
+def measure(render, raw_events: list, repeat: int = 20) -> float:
+    """Get the best time of rendering the schedule"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(raw_events)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(events: int = 300) -> None:
+    raw_events = [make_event(i) for i in range(events)]
+    print(f'schedule: {events} events')
+    for name, render in (('parse per call', old_schedule), ('parse once', new_schedule)):
+        seconds = measure(render, raw_events)
+        print(f'{name:>14}: {seconds * 1000:8.2f} ms   {seconds / events * 1e6:7.2f} us per event')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -4,6 +4,7 @@ import logging
 from dotenv import load_dotenv
 import os
 import asyncio
+import utils.lolesports as lol
 
 logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
                     level=logging.INFO)
@@ -35,8 +36,14 @@ async def on_ready():
 
 async def main():
     async with bot:
+        # warm the esports api cache from disk before serving any command
+        lol.AsyncLolEsports.http.load_cache()
         await load_cogs()
-        await bot.start(DISCORD_BOT_TOKEN)
+        try:
+            await bot.start(DISCORD_BOT_TOKEN)
+        finally:
+            # close the shared esports api session
+            await lol.AsyncLolEsports.http.close()
 
 if __name__ == '__main__':
     asyncio.run(main())
@@ -1,11 +1,23 @@
 import discord
 from discord.ext import commands, tasks
+from discord import app_commands
 from dotenv import load_dotenv
 import os
+import time
+import asyncio
+from typing import Optional
 import utils.lolesports as lol
+import utils.constants as consts
+from utils.resilience import APIError
+from utils.embeds import create_live_event_embeds, create_upcoming_event_embeds
+from utils.polling import PollScheduler
+from utils.live import LiveTracker, Transition, TransitionKind
+from utils.subscriptions import FanOutDispatcher, SubscriptionStore
 
 load_dotenv()
 CHANNEL_ID = os.getenv('CHANNEL_ID')
+ARCHIVE_PATH = os.getenv('ARCHIVE_PATH', 'lolesports_archive')
+SUBSCRIPTIONS_PATH = os.getenv('SUBSCRIPTIONS_PATH', 'lolesports_subscriptions.sqlite3')
 
 class BackgroundTasks(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -14,51 +26,141 @@ class BackgroundTasks(commands.Cog):
         self.live_event_id = None
         self.event_is_ready = False    # ready flag for invoking the upnext command
         self.counter = 1
+        # opened by the first archive sync, numpy is only loaded then
+        self.archive = None
+        # sets the interval of the live task from the schedule after every poll, unless an owner pinned one
+        self.scheduler = PollScheduler()
+        self.fixed_interval = None
+        # the channels to notify, the channel of the environment follows every event until it unsubscribes
+        self.subscriptions = SubscriptionStore(SUBSCRIPTIONS_PATH)
+        if CHANNEL_ID and int(CHANNEL_ID) and self.subscriptions.created:
+            self.subscriptions.subscribe(int(CHANNEL_ID))
+        self.dispatcher = FanOutDispatcher(self.subscriptions, self._create_transition_message, self.send_to_channel)
+        # the live events of the previous poll; their changes are sent to the subscribed channels
+        self.live_tracker = LiveTracker()
+        self.live_tracker.subscribe(self.dispatcher.dispatch)
+        # the api errors (including an open circuit breaker) are retried by the loop instead of stopping it
+        self.my_background_task.add_exception_type(APIError)
         self.my_background_task.start()
+        self.archive_task.start()
 
     def cog_unload(self):
         self.my_background_task.cancel()
+        self.archive_task.cancel()
+        self.subscriptions.close()
 
-    # invoke the live command every 7 minute to check for live matches
-    @tasks.loop(minutes=7.0)
+    # archive the new results of the primary leagues every 6 hours
+    @tasks.loop(hours=6.0)
+    async def archive_task(self):
+        esports = lol.AsyncLolEsports(region='WORLDS')
+        try:
+            if self.archive is None:
+                from utils.archive import ResultArchive
+                self.archive = await asyncio.to_thread(ResultArchive, ARCHIVE_PATH)
+            league_ids = await self.get_primary_league_ids(esports)
+            added = await self.archive.sync(esports, league_ids, await esports.current_tournament_ids(league_ids))
+        except Exception as e:
+            print(f'**`ERROR:`** {type(e).__name__} - {e}')
+            return
+        print(f'Archived {added} new results ({len(self.archive)} in total).')
+
+    @archive_task.before_loop
+    async def before_archive_task(self):
+        await self.bot.wait_until_ready()
+
+    @staticmethod
+    async def get_primary_league_ids(esports: lol.AsyncLolEsports) -> list:
+        registry = await esports.load_league_registry()
+        return [int(league['id']) for league in registry.primary] or registry.major_ids()
+
+    # start time of the next unstarted match of the primary leagues, None if nothing is scheduled
+    async def get_next_start(self, esports: lol.AsyncLolEsports) -> Optional[float]:
+        index = await esports.schedule_index(await self.get_primary_league_ids(esports))
+        event = index.first_unstarted(after=time.time() - self.scheduler.late_window)
+        return None if event is None else event.timestamp
+
+    # the message announcing a transition of a live event; None for the transitions that are not announced
+    def _create_transition_message(self, transition: Transition) -> Optional[dict]:
+        event, kind = transition.event, transition.kind
+        if kind in (TransitionKind.SERIES_STARTED, TransitionKind.SHOW_STARTED):
+            embeds = create_live_event_embeds([event])
+            return {'embeds': embeds} if embeds else None
+        if event.match is None or len(event.match.teams) != 2:
+            return None
+        first, second = event.match.teams
+        title = f'**{event.league.name}** {first.code} vs {second.code}'
+        if kind == TransitionKind.GAME_STARTED:
+            return {'content': f'{title} - Game {transition.game} is live!'}
+        if kind == TransitionKind.GAME_ENDED:
+            return {'content': f'{title} - Game {transition.game} is over: ||{first.code} {first.game_wins} - {second.game_wins} {second.code}||'}
+        if kind == TransitionKind.SERIES_ENDED:
+            return {'content': f'{title} - The series is over! Check the result with `/standings`.'}
+        # the score changes along with the end of a game, which is already announced
+        return None
+
+    # send a notification to a subscribed channel; a deleted channel is unsubscribed
+    async def send_to_channel(self, channel_id: int, message: dict) -> None:
+        try:
+            channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+            await channel.send(**message)
+        except discord.NotFound:
+            self.subscriptions.unsubscribe(channel_id)
+
+    # the streaming activity of a live event
+    @staticmethod
+    def _get_live_activity(event: lol.Event) -> discord.Streaming:
+        # find the en-US stream parameter
+        param = 'riotgames'
+        for stream in event.streams:
+            if stream['locale'] == 'en-US' and stream['provider'] == 'twitch':
+                param = stream['parameter']
+        if event.type == 'show':
+            name = f'{event.league.name} Pre{event.type}'
+        else:
+            name = f'{event.match.teams[0].code} vs {event.match.teams[1].code}'
+        return discord.Streaming(name=name, url=f"https://www.twitch.tv/{param}")
+
+    # send the upcoming international matches like the /upnext command does by default, to the channels following them
+    async def send_upcoming_events(self, esports: lol.AsyncLolEsports) -> None:
+        league_ids = [int(_id) for _id in consts.RegionStr.INTL.value.split(',')]
+        events = (await esports.upcoming_index(league_ids=league_ids)).upcoming(10)
+        embeds = create_upcoming_event_embeds(events) if events else []
+        if embeds:
+            await self.dispatcher.broadcast({'content': f"Here are the **{len(embeds)}** upcoming matches:", 'embeds': embeds}, events)
+
+    # announce the changes of the live events; the interval adapts to the schedule (see PollScheduler)
+    @tasks.loop(seconds=60.0)
     async def my_background_task(self):
-        channel = self.bot.get_channel(int(CHANNEL_ID))
-        # get the content of the last message
-        last_messages = [message async for message in channel.history(limit=1)]
-        ctx = await self.bot.get_context(last_messages[0])
-        esports = lol.LolEsports(region='WORLDS')
-        live_events = esports.live()
+        esports = lol.AsyncLolEsports(region='WORLDS')
+        live_events = await esports.live_events()
+        try:
+            # seed the standings of the running tournaments (reconciled every few minutes), then count the series that just ended
+            await esports.seed_live_standings(await self.get_primary_league_ids(esports))
+            await esports.track_live_results(live_events)
+        except Exception as e:
+            print(f'**`ERROR:`** {type(e).__name__} - {e}')
+        # only the events that changed since the previous poll are announced
+        transitions = await self.live_tracker.update(live_events)
         if live_events: # if there is a live match
-            # find the en-US stream parameter
-            param = 'riotgames'
-            for stream in live_events[0]["streams"]:
-                if stream['locale'] == 'en-US' and stream['provider'] == 'twitch':
-                    param = stream['parameter']
-
-            # check if the live match is a new event
-            if self.live_event_id != live_events[0]['id']:
+            started = [transition.event for transition in transitions
+                       if transition.kind in (TransitionKind.SERIES_STARTED, TransitionKind.SHOW_STARTED)]
+            if started:
                 self.pending_msg = True
-                self.live_event_id = live_events[0]['id'] # update the live event id
-                if live_events[0]['type'] == 'show':
-                    name = f'{live_events[0]["league"]["name"]} Pre{live_events[0]["type"]}'
-                elif live_events[0]['type'] == 'match':
-                    name = f'{live_events[0]["match"]["teams"][0]["code"]} vs {live_events[0]["match"]["teams"][1]["code"]}'
-
-                await ctx.invoke(self.bot.get_command('live'))
-                await self.bot.change_presence(activity=discord.Streaming(name=name, url=f"https://www.twitch.tv/{param}"))
+                self.live_event_id = started[-1].id
+                await self.bot.change_presence(activity=self._get_live_activity(started[-1]))
         else:   # if there is no live match
             if self.pending_msg:    # if there was a live match and it is over
                 self.live_event_id = None
                 # check the upcoming eventlist until is it ready
-                all_events = esports.eventlists(league_ids=esports.get_league_id())
+                index = await esports.upcoming_index(league_ids=esports.get_league_id())
+                next_event = index.first_unstarted()
 
-                if not all_events:    # if there are no events
+                if next_event is None:    # if there are no events
                     self.event_is_ready = True
                     print('There are no upcoming matches.')
                 elif not self.event_is_ready:    # if there are events but not ready
-                    events = esports.get_events_without_tbd(all_events)
-                    if events:
-                        await ctx.invoke(self.bot.get_command('upnext'))
+                    if not next_event.is_tbd:
+                        await self.send_upcoming_events(esports)
                         self.event_is_ready = True
                 
                 # reset the flags once the event is ready and sent
@@ -68,9 +170,86 @@ class BackgroundTasks(commands.Cog):
                     
                 # change the presence of activity to the default status
                 await self.bot.change_presence(activity=discord.Activity(name='/schedule', type=discord.ActivityType.watching))
-        print(f'Checking for live matches #{self.counter}...')
+        try:
+            next_start = await self.get_next_start(esports)
+        except Exception as e:
+            print(f'**`ERROR:`** {type(e).__name__} - {e}')
+            next_start = None
+        delay = self.fixed_interval or self.scheduler.next_delay(bool(live_events), next_start)
+        self.my_background_task.change_interval(seconds=delay)
+        print(f'Checking for live matches #{self.counter}... next check in {delay:.0f}s ({self.scheduler.state})')
         self.counter += 1
     
+    # subscribe the current channel to the live notifications of a league and/or a team
+    @app_commands.command(name='subscribe', description='Get the live notifications of a league or a team in this channel')
+    @app_commands.describe(league='The league to follow. [optional] (ex. LCK, worlds)',
+                           team_code='The team to follow. [optional] (ex. T1, G2, fnc...)')
+    @app_commands.default_permissions(manage_channels=True)
+    @app_commands.guild_only()
+    async def subscribe(self, interaction: discord.Interaction, league: Optional[str] = None, team_code: Optional[str] = None):
+        # defer right away, loading the leagues can take longer than the interaction deadline
+        await interaction.response.defer()
+        follows = await self.resolve_follows(interaction, league, team_code)
+        if follows is None:
+            return
+        subscription = self.subscriptions.subscribe(interaction.channel_id, interaction.guild_id, *follows)
+        await interaction.followup.send(f'This channel now gets the live notifications of {self.describe_follows(subscription)}.')
+
+    # unsubscribe the current channel from the live notifications, or from a league or a team only
+    @app_commands.command(name='unsubscribe', description='Stop the live notifications in this channel')
+    @app_commands.describe(league='The league to stop following. [optional] (ex. LCK, worlds)',
+                           team_code='The team to stop following. [optional] (ex. T1, G2, fnc...)')
+    @app_commands.default_permissions(manage_channels=True)
+    @app_commands.guild_only()
+    async def unsubscribe(self, interaction: discord.Interaction, league: Optional[str] = None, team_code: Optional[str] = None):
+        if self.subscriptions.get(interaction.channel_id) is None:
+            await interaction.response.send_message('This channel is not subscribed to the live notifications.', ephemeral=True)
+            return
+        if not league and not team_code:
+            self.subscriptions.unsubscribe(interaction.channel_id)
+            await interaction.response.send_message('This channel will not get the live notifications anymore.')
+            return
+        await interaction.response.defer()
+        follows = await self.resolve_follows(interaction, league, team_code)
+        if follows is None:
+            return
+        subscription = self.subscriptions.unfollow(interaction.channel_id, *follows)
+        if subscription is None:
+            await interaction.followup.send('This channel will not get the live notifications anymore.')
+            return
+        await interaction.followup.send(f'This channel now gets the live notifications of {self.describe_follows(subscription)}.')
+
+    @staticmethod
+    async def resolve_follows(interaction: discord.Interaction, league: Optional[str], team_code: Optional[str]) -> Optional[tuple]:
+        """Get the (league slugs, team codes) of the options of a deferred command, or None once an error was sent"""
+        esports = lol.AsyncLolEsports(region='WORLDS')
+        leagues, teams = [], []
+        if league:
+            try:
+                registry = await esports.load_league_registry()
+            except Exception as e:
+                print(f'**`ERROR:`** {type(e).__name__} - {e}')
+                await interaction.followup.send('Something went wrong.')
+                return None
+            found = registry.get(league)
+            if found is None:
+                await interaction.followup.send(f'Invalid league: `{league}`! Please try again.')
+                return None
+            leagues.append(found['slug'])
+        if team_code:
+            team = esports.team_registry.get(team_code)
+            if team is None:
+                await interaction.followup.send(f'Invalid team code: `{team_code}`! Please try again.')
+                return None
+            teams.append(team.code)
+        return leagues, teams
+
+    @staticmethod
+    def describe_follows(subscription) -> str:
+        if subscription.follows_everything:
+            return 'every live event'
+        return ', '.join([f'`{slug.upper()}`' for slug in sorted(subscription.leagues)] + [f'`{code}`' for code in sorted(subscription.teams)])
+
     # cancel command to cancel the background task
     @commands.command(name='cancel', hidden = True)
     @commands.is_owner()
@@ -104,8 +283,13 @@ class BackgroundTasks(commands.Cog):
     @commands.command(name='interval', hidden = True)
     @commands.is_owner()
     async def change_interval(self, ctx: commands.Context, seconds: int):
-        self.my_background_task.change_interval(seconds=seconds)
-        await ctx.send(f'Changed interval to {seconds} seconds.')
+        # 0 goes back to the adaptive interval
+        self.fixed_interval = seconds or None
+        if seconds:
+            self.my_background_task.change_interval(seconds=seconds)
+            await ctx.send(f'Changed interval to {seconds} seconds.')
+        else:
+            await ctx.send('The interval adapts to the schedule again.')
 
     @my_background_task.before_loop
     async def before_my_background_task(self):
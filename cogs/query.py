@@ -1,70 +1,28 @@
 import discord
+import asyncio
 from discord.ext import commands
 from discord import app_commands
 import utils.lolesports as lol
+from utils.schedule import ScheduleIndex
+from utils.pagination import LazyPaginator
+from utils.leagues import LeagueRegistry
+from utils.embeds import TIMEZONE, TIMEZONE_OFFSET, convert_timedelta, convert_timezone, create_live_event_embeds, create_upcoming_event_embeds
 from datetime import datetime, timezone, timedelta
-import datetime as dt
-import pytz
 from reactionmenu import ViewMenu, ViewButton, ViewSelect, Page
-from typing import Optional, Union, List, Literal
+from typing import Optional, Union, List
 import utils.constants as consts
-import math
+
 
 class Query(commands.Cog):
     def __init__(self, client: commands.Bot) -> None:
         self.client = client
-        self.TIMEZONE = 'US/Pacific'
-        self.TIMZONE_OFFSET = 7
-        self.lolesports = lol.LolEsports(region='lpl')
+        self.TIMEZONE = TIMEZONE
+        self.lolesports = lol.AsyncLolEsports(region='lpl', stale_while_revalidate=True)
 
     @commands.Cog.listener()
     async def on_ready(self):
         print('Query commands are ready.')    
     
-    @staticmethod
-    def convert_timezone(time_str:str, timezone:str = 'US/Pacific'):
-        time_str_formats = ["%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S.%fZ"]
-        for format_str in time_str_formats:
-            try:
-                # Parse input string as a datetime object in UTC
-                utc_timestamp = datetime.strptime(time_str, format_str)
-                # Convert the UTC timestamp to PST
-                new_time_str= utc_timestamp.replace(tzinfo=pytz.timezone('UTC')).astimezone(pytz.timezone(timezone))
-                # return new_time_str.strftime("%Y-%m-%d %H:%M %p")
-                return new_time_str.strftime("%m/%d/%y, %a %I:%M %p")
-            except ValueError:
-                continue
-        # If no valid format is found
-        return "Invalid time format"
-    
-    @staticmethod
-    def convert_timedelta(iso_8601_time: str, show_direction: bool = False) -> str:
-        start_time = datetime.fromisoformat(iso_8601_time[:-1] + '+00:00')
-        now = datetime.now(dt.timezone.utc)
-        diff = start_time - now
-        # flip the sign if the difference is negative
-        if diff.total_seconds() < 0:
-            diff = -diff
-            direction = "ago"
-        else:
-            direction = "from now"
-        days = diff.days
-        hours, remainder = divmod(diff.seconds, 3600)
-        # minutes = remainder // 60
-        minutes, seconds = divmod(remainder, 60)
-        output = []
-        if days > 0:
-            output.append(f"{days} days")
-        if hours > 0:
-            output.append(f"{hours} hours")
-        if minutes > 0 and days < 1:    # only show minutes if the event is less than 1 day away
-            output.append(f"{minutes} minutes")
-            if seconds > 0 and minutes < 2:   # only show seconds if the event is less than 2 minutes away
-                output.append(f"{seconds} seconds")
-        if show_direction:
-            output.append(direction)
-        return ' '.join(output)
-
     # set the embed color based on the region: LCS = blurple, LEC = teal, LCK = white, LPL = red
     @staticmethod
     def get_region_color(region: str) -> discord.Color:
@@ -101,91 +59,10 @@ class Query(commands.Cog):
     
     # helper function to find the closest match index
     @staticmethod
-    def find_closest_match_index(matches: list) -> Union[int, None]:
-        current_time = datetime.utcnow()
-        
-        def time_diff(match):
-            match_time = datetime.fromisoformat(match['startTime'][:-1])  # Remove the 'Z' at the end and convert to datetime
-            return abs((match_time - current_time).total_seconds())
-        
-        closest_match = min(matches, key=lambda match: time_diff(match))
-
-        if time_diff(closest_match) > 0:  # Ensure a match is found
-            return matches.index(closest_match)
-        else:
-            return None    
-
-    # helper function to create embeds for the two teams; return list of embeds
-    def _create_live_event_embeds(self, events: list, all_streams: bool = False) -> list:
-        embeds = []
-        for event in events:
-            if event['type'] == 'show':
-                time_delta = self.convert_timedelta(event['startTime'], show_direction=True)
-                embed = discord.Embed(title=f"{event['league']['name']} Preshow",
-                    description = f"Live now - {time_delta if time_delta != 'past' else 'In progress'}", 
-                    color = discord.Color.random(),
-                    # set the timestamp to the current time in PST time
-                    timestamp = datetime.now(timezone(timedelta(hours=self.TIMZONE_OFFSET))))
-                embed.set_author(name=event['league']['name'], icon_url=consts.ICONS.get('lolesports'))
-                embed.set_thumbnail(url=event['league']['image'])
-                embed.set_footer(text="Timezone in {}".format(self.TIMEZONE))
-                embed.add_field(name='Schedule', value= f"{self.convert_timezone(event['startTime'], self.TIMEZONE)}", 
-                inline=False)
-                embed.add_field(name='League', value=event['league']['name'], inline=True)
-                embed.add_field(name='Event ID', value=event['id'], inline=True)
-            else:
-                teams = event['match']['teams']
-                # skip the event if both team codes are "TBD"
-                if teams[0]['code'] == 'TBD' and teams[1]['code'] == 'TBD':
-                    continue
-                # set the game_state as description
-                game_state = 'Unstarted'
-                for match in event['match']['games']:
-                    if match['state'] == 'inProgress':
-                        game_state = f"Currently in game {match['number']}"
-                        break
-                embed = discord.Embed(title=f"{event['league']['name']} - {event['blockName'].title()}",
-                    description = game_state, #set description to the current match number
-                    color=discord.Color.teal(),
-                    # url=f"https://lolesports.com/schedule?leagues={event['league']['slug']}",
-                    # set the timestamp to the current time in PST time
-                    timestamp = datetime.now(timezone(timedelta(hours=self.TIMZONE_OFFSET)))
-                )
-                embed.set_author(name=' vs '.join([team['code'] for team in teams]), icon_url=teams[0]['image'])
-                embed.set_thumbnail(url=teams[1]['image'])
-                embed.set_footer(text="Powered by LoL Esports", icon_url= event['league']['image'])
-                embed.add_field(name='Schedule',
-                                value= f"{self.convert_timezone(event['startTime'], self.TIMEZONE)}",
-                                inline=True)
-                embed.add_field(name='\u200b', value='\u200b', inline=True)
-                # add a stream link field which link to the official lolesports stream
-                embed.add_field(name='Stream', value=f"[Watch live](https://lolesports.com/live/worlds/riotgames)", inline=True)
-                # add field for each team
-                for index, team in enumerate(teams):
-                        embed.add_field(name=f'Team {index+1}', value=f"{team['name']}", inline=True)
-                # insert the field for the scores (ex. team1 0-0 team2) inbetween the two teams
-                scores_str = f"{teams[0]['result']['gameWins']} - {teams[1]['result']['gameWins']}"
-                embed.insert_field_at(4, name='Scores', value=f"||{teams[0]['code']} {scores_str} {teams[1]['code']}||", inline=True)
-                # embed.add_field(name='League', value=event['league']['name'], inline=True)
-                # stage field
-                embed.add_field(name='Stage', value=event['blockName'].title(), inline=True)
-                # add a blank field here
-                embed.add_field(name='\u200b', value='\u200b', inline=True)
-                # add a strategy field with the format of bestOf 5
-                embed.add_field(name='Format', value=f"{event['match']['strategy']['type']} {event['match']['strategy']['count']}", inline=True)
-                # add a full list of streams to the streams field
-            if all_streams:
-                official_streams = []
-                for stream in event['streams']:
-                    offcial_link = f"https://lolesports.com/live/worlds/{stream['parameter']}"
-                    official_streams.append(f"[`{stream['mediaLocale']['locale']}`]({offcial_link}) in {stream['mediaLocale']['englishName']}")
-                mid_point = math.ceil(len(official_streams)/2)
-                embed.add_field(name='All Streams', value='\n'.join(official_streams[:mid_point]), inline=True)
-                embed.add_field(name='\u200b', value='\n'.join(official_streams[mid_point:]), inline=True)
-
-            # add to the embeds list
-            embeds.append(embed)
-        return embeds
+    def find_closest_match_index(matches: Union[List[lol.Event], ScheduleIndex]) -> Union[int, None]:
+        if not isinstance(matches, ScheduleIndex):
+            matches = ScheduleIndex(matches)
+        return matches.closest_index()
 
     # create a hybrid live command that uses slash commands and regular commands
     @commands.hybrid_command(name='live', description='Get the live events', with_app_command=True)
@@ -197,8 +74,8 @@ class Query(commands.Cog):
         all_streams: bool
             whether to display all the streams for each event. [optional] Defaults to False.
         """
-        events = self.lolesports.live()
-        embeds = self._create_live_event_embeds(events, all_streams)
+        events = await self.lolesports.live_events()
+        embeds = create_live_event_embeds(events, all_streams, self.TIMEZONE)
         async with ctx.typing():
             if not events:
                 await ctx.send('There are currently no `live` events. Feel free to check out the `/schedule` command or at [lolesports](https://lolesports.com/) for more details! 😊')
@@ -207,70 +84,89 @@ class Query(commands.Cog):
                 await ctx.send(embed=embed)
                 
     
+    # helper function to create the embed of a scheduled match
+    def _create_schedule_embed(self, event: lol.Event) -> discord.Embed:
+        match = event.match
+        teams = [(team.name, team.code) for team in match.teams]
+        embed = discord.Embed(title=f"{event.league.name} {event.block_name.title()}",
+            description = f"{event.state.title()} match - {convert_timedelta(event.start, show_direction=True)}",
+            # color based on the state of the event: unstarted = teal, completed = orange, inProgress/other = green,
+            color = discord.Color.teal() if event.state == 'unstarted' else discord.Color.orange() if event.state == 'completed' else discord.Color.green(),
+            # set the timestamp to the current time in PST time
+            timestamp = datetime.now(timezone(timedelta(hours=TIMEZONE_OFFSET))))
+        embed.set_footer(text="Timezone in {}".format(self.TIMEZONE))
+        # set author image to team 1 image
+        embed.set_author(name=' vs '.join([code for _, code in teams]), icon_url=match.teams[0].image)
+        # set thumbnail to team 2 image
+        embed.set_thumbnail(url=match.teams[1].image)
+        embed.add_field(name='Start Time',
+                        value= f"{convert_timezone(event.start, self.TIMEZONE)}", 
+                        inline=False)
+        # add field for each team
+        for index, team in enumerate(teams):
+                embed.add_field(name=f'Team {index+1}', value=f'{team[0]} ({team[1]})', inline=True)    
+        # add a blank field 
+        embed.insert_field_at(2, name='\u200b', value='\u200b', inline=True)    #\uFEFF
+        embed.add_field(name='Format', value=f"{match.strategy_type} {match.strategy_count}", inline=True)
+        embed.add_field(name='League', value=event.league.name, inline=True)
+        embed.add_field(name='Stage', value=event.block_name.title(), inline=True)
+        return embed
+
     @app_commands.command(name='schedule', description='Get the schedule of upcoming events')
     @app_commands.describe(region='The region to get the schedule for. [optional] Defaults to WORLDS.')
     async def schedule(self, interaction: discord.Interaction, region: Optional[str] = 'WORLDS'):
+        # defer right away, the api calls below can take longer than the interaction deadline
+        await interaction.response.defer(thinking=True)
         # validate region
         try:
-            keyword = lol.Region[region.upper()]
-        except KeyError as e:
+            registry = await self.lolesports.load_league_registry()
+        except Exception as e:
             print(f'**`ERROR:`** {type(e).__name__} - {e}')
-            await interaction.response.send_message(f'Invalid region: {region}')
+            await interaction.followup.send('Something went wrong.')
             return
-        events = self.lolesports.schedules(keyword.value)
-        await interaction.response.defer(thinking=True)
-
-        # find the first page that is closest to the current time
-        embeds = []
-        menu = ViewMenu(interaction, menu_type=ViewMenu.TypeEmbed)
-        for event in events:
-            # skip the event that is a show in progress
-            if event['type'] == 'show':
-                print(event)
-                continue
-            teams = [(team['name'], team['code']) for team in event['match']['teams']]
-            embed = discord.Embed(title=f"{event['league']['name']} {event['blockName'].title()}",
-                description = f"{event['state'].title()} match - {self.convert_timedelta(event['startTime'], show_direction=True)}",
-                # color based on the state of the event: unstarted = teal, completed = orange, inProgress/other = green,
-                color = discord.Color.teal() if event['state'] == 'unstarted' else discord.Color.orange() if event['state'] == 'completed' else discord.Color.green(),
-                # set the timestamp to the current time in PST time
-                timestamp = datetime.now(timezone(timedelta(hours=self.TIMZONE_OFFSET))))
-            embed.set_footer(text="Timezone in {}".format(self.TIMEZONE))
-            # set author image to team 1 image
-            embed.set_author(name=' vs '.join([code for _, code in teams]), icon_url=event['match']['teams'][0]['image'])
-            # set thumbnail to team 2 image
-            embed.set_thumbnail(url=event['match']['teams'][1]['image'])
-            embed.add_field(name='Start Time',
-                            value= f"{self.convert_timezone(event['startTime'], self.TIMEZONE)}", 
-                            inline=False)
-            # add field for each team
-            for index, team in enumerate(teams):
-                    embed.add_field(name=f'Team {index+1}', value=f'{team[0]} ({team[1]})', inline=True)    
-            # add a blank field 
-            embed.insert_field_at(2, name='\u200b', value='\u200b', inline=True)    #\uFEFF
-            embed.add_field(name='Format', value=f"{event['match']['strategy']['type']} {event['match']['strategy']['count']}", inline=True)
-            embed.add_field(name='League', value=event['league']['name'], inline=True)
-            embed.add_field(name='Stage', value=event['blockName'].title(), inline=True)
-            # add a strategy field with the format of bestOf 5
-            embeds.append(embed)
-
-        # rearrange the embeds: put the page that is closest to the current time as the first page
-        closest_match_index = self.find_closest_match_index(events)
-        if closest_match_index:
-            embeds = embeds[closest_match_index:] + embeds[:closest_match_index]
-            menu.add_pages(embeds)
-        menu.add_button(ViewButton.go_to_first_page())
-        menu.add_button(ViewButton(style=discord.ButtonStyle.primary, label='Back', custom_id=ViewButton.ID_PREVIOUS_PAGE))
-        menu.add_button(ViewButton(style=discord.ButtonStyle.green, label='Next', custom_id=ViewButton.ID_NEXT_PAGE))
-        menu.add_button(ViewButton.go_to_last_page())
-        await menu.start()
+        league_id = registry.id_of(region)
+        if league_id is None:
+            await interaction.followup.send(f'Invalid region: {region}')
+            return
+        # both parse the same getSchedule response, it is only requested once
+        try:
+            index, first_page = await asyncio.gather(self.lolesports.schedule_index(league_id), self.lolesports.schedule_page(league_id))
+        except Exception as e:
+            print(f'**`ERROR:`** {type(e).__name__} - {e}')
+            await interaction.followup.send('Something went wrong.')
+            return
+        # skip the shows so that every page is a match
+        events = list(index.matches())
+        # find the page that is closest to the current time
+        closest_match_index = index.matches().closest_index()
+        if closest_match_index is None:
+            await interaction.followup.send(f'There are no matches scheduled for {region}.')
+            return
+        # the newer pages of the schedule are only fetched once the user moves past the loaded matches
+        newer_pages = self.lolesports.schedule_pages(league_id, direction='newer', page_token=first_page.newer) if first_page.newer else None
+
+        async def load_more() -> int:
+            while newer_pages is not None:
+                page = await anext(newer_pages, None)
+                if page is None:
+                    break
+                matches = [event for event in page.events if event.type == 'match']
+                if matches:
+                    events.extend(matches)
+                    break
+            return len(events)
+
+        # the embeds are only built when their page is visited, starting with the match closest to the current time
+        menu = LazyPaginator(len(events), lambda page: self._create_schedule_embed(events[page]),
+                             author_id=interaction.user.id, load_more=load_more)
+        await menu.start(interaction, closest_match_index)
 
     # helper function to create embeds for the leagues
     def _create_league_embeds(self, leagues: list, color: discord.Color) -> list:
         '''Create embeds for the leagues'''
         # create an embed list to store all the embeds
         embeds = []
-        for league in leagues:
+        for page, league in enumerate(leagues, 1):
             embed = discord.Embed(title=f"{league['name']}",
                 color=color,
                 url=f"https://lolesports.com/schedule?leagues={league['slug']}"
@@ -281,22 +177,31 @@ class Query(commands.Cog):
             embed.add_field(name='Schedules', value=f"[Click here](https://lolesports.com/schedule?leagues={league['slug']})", inline=True)
             embed.add_field(name='ID', value=league['id'], inline=True)
             embed.set_image(url=league['image'])
-            embed.set_footer(text="Powered by Riot Games", icon_url=consts.ICONS.get('riot'))
+            # the page director is set here since the menus do not touch the shared embeds (show_page_director=False)
+            embed.set_footer(text=f"Page {page}/{len(leagues)}: Powered by Riot Games", icon_url=consts.ICONS.get('riot'))
             embeds.append(embed)
 
         return embeds
 
+    # helper function to get the embeds of every group of leagues; built once per version of the leagues
+    def _get_league_pages(self, registry: LeagueRegistry) -> tuple:
+        '''Get the (all, major, primary) league embeds, shared by every /leagues menu until the leagues change'''
+        return self.lolesports.render_cache.get_or_render(
+            ('league_embeds',), registry.fingerprint,
+            lambda: (self._create_league_embeds(registry.leagues, discord.Color.blurple()),
+                     self._create_league_embeds(registry.major, discord.Color.blurple()),
+                     self._create_league_embeds(registry.primary, discord.Color.green())))
+
     # using slash commands create the leagues command
     @app_commands.command(name='leagues', description='Display all the esports pro leagues and regions')
     async def leagues(self, interaction: discord.Interaction,):
-        leagues = self.lolesports.leagues(is_sorted=True)       
-        if leagues is None:
+        try:
+            registry = await self.lolesports.load_league_registry()
+        except Exception as e:
+            print(f'**`ERROR:`** {type(e).__name__} - {e}')
             await interaction.response.send_message('Something went wrong.')
             return
-        major_leagues, popular_leagues, primary_leagues = self.lolesports._get_sub_leagues(leagues)
-        leagues_embeds = self._create_league_embeds(leagues, discord.Color.blurple())
-        major_leagues_embeds = self._create_league_embeds(major_leagues, discord.Color.blurple())
-        primary_leagues_embeds = self._create_league_embeds(primary_leagues, discord.Color.green())
+        leagues_embeds, major_leagues_embeds, primary_leagues_embeds = self._get_league_pages(registry)
 
         # # approach #2 to create a task and pass it to the followup
         # async def task():
@@ -369,7 +274,7 @@ class Query(commands.Cog):
             disabled=True   # disable the button by default since the menu starts with the primary leagues
         )
         # intialize the basic layout for the starting menu: major leagues
-        menu = ViewMenu(interaction, menu_type=ViewMenu.TypeEmbed, name='leagues-menu')
+        menu = ViewMenu(interaction, menu_type=ViewMenu.TypeEmbed, name='leagues-menu', show_page_director=False)
         # navigation buttons
         nav_buttons = [
             ViewButton(style=discord.ButtonStyle.gray, label='First Page', custom_id=ViewButton.ID_GO_TO_FIRST_PAGE),
@@ -384,77 +289,89 @@ class Query(commands.Cog):
         menu.add_pages(primary_leagues_embeds)  # landing pages
         await menu.start()
 
+    # helper function to create the embed of a season standings; reused until the standings change
+    def _create_standing_embed(self, standing: lol.Standing, league: dict) -> discord.Embed:
+        '''Create the embed of the regular season standings of a league'''
+        return self.lolesports.render_cache.get_or_render(
+            ('standing_embed', standing.season), (standing.version, league['name'], league['image']),
+            lambda: discord.Embed(title=f"{standing.season} Regular Season Standings",
+                description=''.join(f"\n{row.ordinal}. {row.team.name} ({row.team.code}): {row.wins}-{row.losses}" for row in standing.rows),
+                color=self.get_region_color(league['name'])).set_thumbnail(url=league['image']))
+
     # create a slash command to get the standings
     @app_commands.command(name='all-standings', description='Get the standings for all the major leagues')
     @app_commands.describe(timeframe='The timeframe/keyword to get the standings for. [required] Defaults to summer_2023.')
     async def all_standings(self, interaction: discord.Interaction, timeframe: str = 'summer_2023'):
         await interaction.response.defer()
-        major_league_ids = self.lolesports.get_major_league_ids()
-        message = self.lolesports.display_standings(major_league_ids, timeframe=timeframe, to_str=True)
+        try:
+            registry = await self.lolesports.load_league_registry()
+            message = await self.lolesports.display_standings(registry.major_ids(), timeframe=timeframe, to_str=True)
+        except Exception as e:
+            print(f'**`ERROR:`** {type(e).__name__} - {e}')
+            await interaction.followup.send('Something went wrong.')
+            return
         await interaction.followup.send(f"```{message}```")
     
     # create a slash command to get the standings of a specific league
     @app_commands.command(name='standings', description='Get the standings for a specific league')
     @app_commands.describe(league='The league to get the standings for. [required] Defaults to LCS.')
     async def standings(self, interaction: discord.Interaction, league: str = 'LCS'):
+        # defer right away, loading the leagues can take longer than the interaction deadline
+        await interaction.response.defer()
         # validate league
         try:
-            keyword = lol.Region[league.upper()]
-        except KeyError as e:
+            registry = await self.lolesports.load_league_registry()
+        except Exception as e:
             print(f'**`ERROR:`** {type(e).__name__} - {e}')
-            await interaction.response.send_message(f'Invalid league: {league}')
+            await interaction.followup.send('Something went wrong.')
             return
-        await interaction.response.defer()
-        message = self.lolesports.display_standings([keyword.value], timeframe= "summer_2023", to_str=True)
-        await interaction.followup.send(f"```{message}```")
-        
-        leagues = self.lolesports.leagues(is_sorted=True)
-        if leagues is None:
-            await interaction.response.send_message('Something went wrong.')
+        league_id = registry.id_of(league)
+        if league_id is None:
+            await interaction.followup.send(f'Invalid league: {league}')
             return
-        major_leagues = self.lolesports._get_sub_leagues(leagues)[0]
-        major_regions_ids = self.lolesports.get_major_league_ids()
+        major_leagues = registry.major
+        major_regions_ids = registry.major_ids()
         timeframe = "summer_2023"
 
-        tournaments = self.lolesports.tournaments(major_regions_ids)
+        # fetch the standings of the league and the tournaments of the major leagues concurrently
+        try:
+            message, tournaments = await asyncio.gather(
+                self.lolesports.display_standings([league_id], timeframe=timeframe, to_str=True),
+                self.lolesports.tournaments(major_regions_ids))
+        except Exception as e:
+            print(f'**`ERROR:`** {type(e).__name__} - {e}')
+            await interaction.followup.send('Something went wrong.')
+            return
+        await interaction.followup.send(f"```{message}```")
+
         # get the tournaments for the timeframe
         matching_tournaments = self.lolesports._extract_tournaments_by_timeframe(tournaments, timeframe)
         # get the matching ids
         matching_ids = self.lolesports.extract_tournament_ids(matching_tournaments)
         # get the standings
-        standings = self.lolesports.standings(matching_ids)
-        # display the standings
-        standings_results = []
-        standings_titles = []
-        for standing in standings:
-            for standing_name, rankings in standing.items():
-                standings_titles.append(f"{standing_name}")
-                standding_str = ""
-                for ranking in rankings:    # ranking within each league
-                    ordinal = ranking['ordinal']
-                    team = ranking['teams'][0] # only one team per slot
-                    name = team['name']
-                    code = team['code']
-                    wins = team['record']['wins']
-                    losses = team['record']['losses']
-                    standding_str += f"\n{ordinal}. {name} ({code}): {wins}-{losses}"
-                standings_results.append(standding_str)
-
-        menu = ViewMenu(interaction, menu_type=ViewMenu.TypeEmbed)
+        try:
+            standings = await self.lolesports.live_standings(matching_ids)
+        except Exception as e:
+            print(f'**`ERROR:`** {type(e).__name__} - {e}')
+            await interaction.followup.send('Something went wrong.')
+            return
+
+        # no page director: the standing embeds come from the render cache and are shared between menus
+        menu = ViewMenu(interaction, menu_type=ViewMenu.TypeEmbed, show_page_director=False)
         menu.add_page(discord.Embed(title="Seasonal Standings", color=discord.Color.dark_magenta()))
 
         menu.add_select(ViewSelect(title="Select from the following leagues", options={
             discord.SelectOption(label="LEC", emoji="<:lec:1148398301641703516>") : [
-                Page(embed=discord.Embed(title=f"{standings_titles[0]} Regular Season Standings", description=standings_results[0], color=self.get_region_color("LEC")).set_thumbnail(url=major_leagues[1]['image'])),
+                Page(embed=self._create_standing_embed(standings[0], major_leagues[1])),
             ],
             discord.SelectOption(label="LCK", emoji="<:lck:1148398360307433593>") : [
-                Page(embed=discord.Embed(title=f"{standings_titles[1]} Regular Season Standings", description=standings_results[1], color=self.get_region_color("LCK")).set_thumbnail(url=major_leagues[2]['image'])),
+                Page(embed=self._create_standing_embed(standings[1], major_leagues[2])),
             ],
             discord.SelectOption(label="LCS", emoji="<:lcs:1148398424950063196>") : [
-                Page(embed=discord.Embed(title=f"{standings_titles[2]} Regular Season Standings", description=standings_results[2], color=self.get_region_color("LCS")).set_thumbnail(url=major_leagues[0]['image'])),
+                Page(embed=self._create_standing_embed(standings[2], major_leagues[0])),
             ],            
             discord.SelectOption(label="LPL", emoji="<:lpl:1148398196683448380>") : [
-                Page(embed=discord.Embed(title=f"{standings_titles[3]} Regular Season Standings", description=standings_results[3], color=self.get_region_color("LPL")).set_thumbnail(url=major_leagues[3]['image'])),
+                Page(embed=self._create_standing_embed(standings[3], major_leagues[3])),
             ],
         }))
 
@@ -462,41 +379,6 @@ class Query(commands.Cog):
         menu.add_button(ViewButton.next())
         await menu.start()
 
-    # helper function to create embeds for the two teams
-    def _create_event_embeds(self, events: List) -> list:
-        '''Create embeds for the two teams'''
-        embeds = []
-        # loop through the events and send the embeds
-        for event in events:
-            teams = event['match']['teams']
-            # skip the event if both team codes are "TBD"
-            if teams[0]['code'] == 'TBD' and teams[1]['code'] == 'TBD':
-                continue
-            embed = discord.Embed(title=event['league']['name'],
-                description = f"Match starts in `{self.convert_timedelta(event['startTime'])}`",
-                color=discord.Color.teal(),
-                # set the timestamp to the current time in PST time
-                timestamp = datetime.now(timezone(timedelta(hours=self.TIMZONE_OFFSET)))
-            )
-            embed.set_author(name=' vs '.join([team['code'] for team in teams]), 
-                             icon_url=teams[0]['image'],
-            )
-            embed.set_thumbnail(url=teams[1]['image'])
-            embed.set_footer(text="Powered by LoL Esports", icon_url=consts.ICONS.get('worlds'))
-            embed.add_field(name='Start Time',
-                            value= f"{self.convert_timezone(event['startTime'], self.TIMEZONE)}", 
-                            inline=True)
-            # add a blank field here
-            embed.add_field(name='\u200b', value='\u200b', inline=True)
-            embed.add_field(name='Schedule', value=f"[Click here](https://lolesports.com/schedule?leagues={event['league']['slug']})", inline=True)
-            # add field for each team
-            for index, team in enumerate(teams):
-                embed.add_field(name=f'Team {index+1}', value=team["code"], inline=True)
-            # add a blank field at the second to last position
-            embed.insert_field_at(-1, name='\u200b', value='\u200b', inline=True)
-            embeds.append(embed)
-        return embeds
-    
     # create a hybrid command to get the upcoming events for a specific team or league
     @commands.hybrid_command(name='upnext', description='Show the upcoming events for a specific team or league', with_app_command=True)
     async def upcoming_events(self, ctx: commands.Context,  
@@ -524,19 +406,20 @@ class Query(commands.Cog):
         async with ctx.typing():
         # prioritize the team code over the league if both are given
             if team_code:
-                team_slug = team_code
-                # first check if the team code is in the dictionary values
-                if team_code.lower() not in consts.WORLDS_TEAMS.values():
-                    team_slug = consts.WORLDS_TEAMS.get(team_code.lower())  # team_code is the key, team_slug is the value
-                    # if the team code is still not valid, send an error message
-                    if team_slug is None:
-                        await ctx.send(f'Invalid team code: `{team_code}`! Please try again.')
-                        return
-                events = self.lolesports.eventlists(team_slug=team_slug)
-            else:
-                events = self.lolesports.eventlists(league_ids=league_ids)
-
-            embeds = self._create_event_embeds(events[:limit])
+                # the autocomplete gives the slug, a typed in code or name is resolved by the registry
+                team = self.lolesports.team_registry.get(team_code)
+                if team is None:
+                    await ctx.send(f'Invalid team code: `{team_code}`! Please try again.')
+                    return
+            try:
+                index = await self.lolesports.upcoming_index(team_slug=team.slug) if team_code else await self.lolesports.upcoming_index(league_ids=league_ids)
+            except Exception as e:
+                print(f'**`ERROR:`** {type(e).__name__} - {e}')
+                await ctx.send('Something went wrong.')
+                return
+
+            events = index.upcoming(limit)
+            embeds = create_upcoming_event_embeds(events, self.TIMEZONE) if events else []
             # check if there are any upcoming events
             if not events or not embeds:
                 await ctx.send('There are no upcoming events for this `team` or `league`. Come back later! 😊') 
@@ -558,10 +441,10 @@ class Query(commands.Cog):
         List[app_commands.Choice[team_code: team_slug]]
             A list of choices of [team_code:team_slug] pairs
         '''
-        teams = consts.WORLDS_TEAMS.items()
-        return[
-            app_commands.Choice(name=code.upper(), value=slug)
-            for code, slug in teams if current.lower() in code.lower()
+        self.lolesports.refresh_team_registry_soon()
+        return [
+            app_commands.Choice(name=f'{team.code} - {team.name}'[:100], value=team.slug)
+            for team in self.lolesports.team_registry.search(current)
         ]
 
     # create a slash command to get the players and info for a specific team
@@ -577,10 +460,16 @@ class Query(commands.Cog):
             The team code of the given team. [required] (ex. C9, edg, t1, fnc...)
         '''
         await interaction.response.defer()
-        team = self.lolesports.team(team_code)
-        roster = self.lolesports.get_roster(team)
-        league = team['homeLeague']['name']
-        league_image = self.lolesports.get_image_url(league)
+        entry = self.lolesports.team_registry.get(team_code)
+        try:
+            team = await self.lolesports.team(entry.slug if entry else team_code)
+            roster = self.lolesports.get_roster(team)
+            league = team['homeLeague']['name']
+            league_image = await self.lolesports.get_image_url(league)
+        except Exception as e:
+            print(f'**`ERROR:`** {type(e).__name__} - {e}')
+            await interaction.followup.send('Something went wrong.')
+            return
         embed = discord.Embed(title=f"{team['name']}",
             color=self.get_region_color(league),
             url=f"https://lolesports.com/team/{team['slug']}"
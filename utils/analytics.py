@@ -0,0 +1,128 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+
+class HeadToHead:
+    """The team by team head-to-head results of a list of matches
+
+    ``series[i, j]`` is the number of series team ``i`` won against team ``j`` and ``games[i, j]`` the number of
+    games, so the record of a team is a row of the matrices and its losses the matching column. Only the decided
+    series are counted.
+
+    Parameters
+    ----------
+    codes: `list` of `str`
+        The team codes in the order of the rows, by first appearance in the matches
+    series: `numpy.ndarray`
+        The series wins matrix
+    games: `numpy.ndarray`
+        The game wins matrix
+    first_meeting: `numpy.ndarray`
+        The index of the first match between two teams, used to list the opponents in the order they were met
+    """
+    def __init__(self, codes: List[str], series: np.ndarray, games: np.ndarray, first_meeting: np.ndarray):
+        self.codes = codes
+        self.index: Dict[str, int] = {code: i for i, code in enumerate(codes)}
+        self.series = series
+        self.games = games
+        self.first_meeting = first_meeting
+
+    @classmethod
+    def from_matches(cls, matches: List[dict]) -> 'HeadToHead':
+        """Build the matrices of the raw matches of a tournament (ex. :meth:`utils.lolesports.LolEsports.matches`)
+
+        Parameters
+        ----------
+        matches: `list` of `dict`
+            A list of matches
+
+        Returns
+        -------
+        head_to_head: `HeadToHead`
+            The head-to-head results of the decided matches
+        ---
+        """
+        pairs = [(match_position, match['teams']) for match_position, match in enumerate(matches) if len(match.get('teams') or []) == 2]
+        results = [(first.get('result') or {}, second.get('result') or {}) for _, (first, second) in pairs]
+        count = len(pairs)
+        outcome = np.array([first_result.get('outcome') or '' for first_result, _ in results], dtype=str)
+        decided = (outcome == 'win') | (outcome == 'loss')
+        # the codes of both teams of every decided match, interleaved so that their first appearance is the match order
+        team_codes = np.array([team['code'] for _, teams in pairs for team in teams], dtype=str).reshape(count, 2)[decided]
+        codes, first_seen, inverse = np.unique(team_codes.ravel(), return_index=True, return_inverse=True)
+        # the rows of the matrices follow the first appearance of the teams rather than the sorted codes
+        order = np.argsort(first_seen, kind='stable')
+        rank = np.empty(len(codes), dtype=np.intp)
+        rank[order] = np.arange(len(codes))
+        teams = rank[inverse].reshape(-1, 2)
+        first, second = teams[:, 0], teams[:, 1]
+        first_won = (outcome == 'win')[decided]
+        first_games = np.fromiter((first_result.get('gameWins') or 0 for first_result, _ in results), dtype=np.int32, count=count)[decided]
+        second_games = np.fromiter((second_result.get('gameWins') or 0 for _, second_result in results), dtype=np.int32, count=count)[decided]
+        position = np.fromiter((match_position for match_position, _ in pairs), dtype=np.int32, count=count)[decided]
+
+        n = len(codes)
+        series = np.zeros((n, n), dtype=np.int32)
+        games = np.zeros((n, n), dtype=np.int32)
+        first_meeting = np.full((n, n), np.iinfo(np.int32).max, dtype=np.int32)
+        winner = np.where(first_won, first, second)
+        loser = np.where(first_won, second, first)
+        np.add.at(series, (winner, loser), 1)
+        np.add.at(games, (first, second), first_games)
+        np.add.at(games, (second, first), second_games)
+        np.minimum.at(first_meeting, (first, second), position)
+        np.minimum.at(first_meeting, (second, first), position)
+        return cls(codes[order].tolist(), series, games, first_meeting)
+
+    def __contains__(self, code: str) -> bool:
+        return code.upper() in self.index
+
+    def _matrix(self, by_game: bool) -> np.ndarray:
+        return self.games if by_game else self.series
+
+    def record(self, team_code: str, by_game: bool = False) -> Tuple[int, int]:
+        """Get the (wins, losses) of a team, by series or by game"""
+        i = self.index[team_code.upper()]
+        matrix = self._matrix(by_game)
+        return int(matrix[i].sum()), int(matrix[:, i].sum())
+
+    def win_rate(self, team_code: str, by_game: bool = False) -> float:
+        """Get the win rate of a team in percent, by series or by game"""
+        wins, losses = self.record(team_code, by_game)
+        return wins / (wins + losses) * 100 if wins + losses else 0.0
+
+    def opponents(self, team_code: str, by_game: bool = False) -> List[Tuple[str, int, int]]:
+        """Get the (opponent code, wins, losses) of a team against every opponent it met, in the order they were met"""
+        i = self.index[team_code.upper()]
+        matrix = self._matrix(by_game)
+        met = np.flatnonzero((self.series[i] + self.series[:, i]) > 0)
+        met = met[np.argsort(self.first_meeting[i, met], kind='stable')]
+        return [(self.codes[j], int(matrix[i, j]), int(matrix[j, i])) for j in met]
+
+    def team_records(self, team_code: str, by_game: bool = False, ascending: bool = False) -> List[str]:
+        """Get the records of a team against each opponent followed by its total and win rate
+
+        Parameters
+        ----------
+        team_code: `str`
+            The team code to get the records from
+        by_game: `bool`
+            Whether to count the individual games instead of the series
+        ascending: `bool`
+            Whether to sort the records by ascending wins instead of descending
+
+        Returns
+        -------
+        result_strings: `list` of `str`
+            A list of team records, the last 2 items being the total and the win rate
+        ---
+        """
+        team_code = team_code.upper()
+        if team_code not in self.index:
+            return ["Total: 0-0", "Win Rate: 0.0%"]
+        opponents = sorted(self.opponents(team_code, by_game), key=lambda record: record[1], reverse=not ascending)
+        result_strings = [f"{team_code} {wins}-{losses} {opponent}" for opponent, wins, losses in opponents]
+        wins, losses = self.record(team_code, by_game)
+        result_strings.append(f"Total: {wins}-{losses}")
+        result_strings.append(f"Win Rate: {self.win_rate(team_code, by_game):.1f}%")
+        return result_strings
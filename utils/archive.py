@@ -0,0 +1,283 @@
+import asyncio
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from utils.lolesports import Event
+
+# column name -> dtype of the archived results; one row per decided series, sorted by start time
+COLUMNS = {
+    'match_id': np.int64,
+    'start': np.int64,          # unix time in seconds
+    'league': np.int32,         # index in the string table
+    'tournament_id': np.int64,  # 0 when unknown
+    'team_a': np.int32,         # index in the string table
+    'team_b': np.int32,
+    'games_a': np.int8,
+    'games_b': np.int8,
+    'winner': np.int8,          # 0 for team_a, 1 for team_b
+}
+
+
+def to_epoch(value: Union[datetime, str, float, int, None]) -> Optional[int]:
+    """Convert an aware datetime, an iso 8601 string (ex. 2023-10-10T08:00:00Z) or a unix time into a unix time"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+class ResultArchive:
+    """A local columnar archive of the results of past series
+
+    Every column is a ``.npy`` file of the archive directory, memory-mapped when the archive is opened so that only
+    the pages touched by a query are read and the memory used stays bounded whatever the size of the archive. The
+    team codes and league slugs are stored once in a string table. Rows are kept sorted by start time, so a date
+    range is a binary search before the other filters are applied to the remaining slice.
+
+    Each flush writes a new generation of the archive in its own sub directory (ex. ``00000003``) and the ``CURRENT``
+    file names the generation to open, so the columns and the string table always come from the same flush.
+
+    Parameters
+    ----------
+    path: `str`
+        The directory of the archive, created on the first :meth:`flush`
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.generation = 0
+        self.strings: List[str] = []
+        self._string_index: Dict[str, int] = {}
+        self.columns: Dict[str, np.ndarray] = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._known: set = set()
+        self._pending: List[tuple] = []
+        self.open()
+
+    def open(self) -> None:
+        """Memory-map the columns of the current generation of the archive directory, if it exists
+
+        An archive with a missing or unreadable file is ignored and the archive starts empty, the next syncs fill
+        it back.
+        """
+        current_path = os.path.join(self.path, 'CURRENT')
+        if not os.path.exists(current_path):
+            return
+        try:
+            with open(current_path, encoding='utf-8') as f:
+                generation = int(f.read().strip())
+            directory = os.path.join(self.path, f'{generation:08d}')
+            with open(os.path.join(directory, 'strings.json'), encoding='utf-8') as f:
+                strings = json.load(f)
+            columns = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r') for name in COLUMNS}
+        except (OSError, ValueError) as e:
+            print(f'**`ERROR:`** {type(e).__name__} - {e}')
+            return
+        if len({len(values) for values in columns.values()}) != 1:
+            print(f'**`ERROR:`** the columns of the archive {self.path} have different lengths, starting empty')
+            return
+        self.generation = generation
+        self.strings = strings
+        self._string_index = {string: i for i, string in enumerate(self.strings)}
+        self.columns = columns
+        self._known = set(self.columns['match_id'].tolist())
+
+    def __len__(self) -> int:
+        return len(self.columns['match_id'])
+
+    def _intern(self, string: str) -> int:
+        index = self._string_index.get(string)
+        if index is None:
+            index = self._string_index[string] = len(self.strings)
+            self.strings.append(string)
+        return index
+
+    def ingest(self, events: Iterable[Event], tournament_id: int = 0) -> int:
+        """Queue the decided series of the given events that are not archived yet; call :meth:`flush` to store them
+
+        Parameters
+        ----------
+        events: `iterable` of `Event`
+            Any events; shows, undecided and already archived series are skipped
+        tournament_id: `int`
+            The tournament of the events, when known
+
+        Returns
+        -------
+        added: `int`
+            The number of new series
+        ---
+        """
+        added = 0
+        for event in events:
+            match = event.match
+            if match is None or len(match.teams) != 2 or match.id in self._known:
+                continue
+            first, second = match.teams
+            if first.outcome not in ('win', 'loss'):
+                continue
+            self._known.add(match.id)
+            self._pending.append((match.id, int(event.timestamp), self._intern(event.league.slug or event.league.name),
+                                  tournament_id, self._intern(first.code.upper()), self._intern(second.code.upper()),
+                                  first.game_wins, second.game_wins, 0 if first.outcome == 'win' else 1))
+            added += 1
+        return added
+
+    def flush(self) -> int:
+        """Write the queued series to the archive directory
+
+        The columns and the string table are written to a new generation directory, then the ``CURRENT`` file is
+        replaced to point to it, so a crash leaves the previous generation in place. Every flush rewrites the whole
+        columns (the new rows are merged in start time order), which is a few megabytes for years of results of
+        every league, so the 6-hourly syncs flush once each. Blocking, see :meth:`sync` for the async callers.
+
+        Returns
+        -------
+        flushed: `int`
+            The number of series written
+        ---
+        """
+        if not self._pending:
+            return 0
+        pending = list(zip(*self._pending))
+        columns = {name: np.concatenate([np.asarray(self.columns[name]), np.array(values, dtype=dtype)])
+                   for (name, dtype), values in zip(COLUMNS.items(), pending)}
+        order = np.lexsort((columns['match_id'], columns['start']))
+        # drop the memory maps before removing their files
+        self.columns = columns
+        previous = os.path.join(self.path, f'{self.generation:08d}')
+        generation = self.generation + 1
+        # a directory left by an interrupted flush is written over
+        directory = os.path.join(self.path, f'{generation:08d}')
+        os.makedirs(directory, exist_ok=True)
+        for name, values in columns.items():
+            np.save(os.path.join(directory, f'{name}.npy'), values[order])
+        with open(os.path.join(directory, 'strings.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.strings, f)
+        temp_path = os.path.join(self.path, 'CURRENT.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(str(generation))
+        os.replace(temp_path, os.path.join(self.path, 'CURRENT'))
+        self.generation = generation
+        shutil.rmtree(previous, ignore_errors=True)
+        flushed = len(self._pending)
+        self._pending.clear()
+        self.open()
+        return flushed
+
+    async def sync(self, esports, league_ids: List[int], tournament_ids: Iterable[int] = (), max_pages: Optional[int] = 20) -> int:
+        """Archive the new results of the given leagues and tournaments
+
+        The completed matches of each tournament (:meth:`matches_with_vods`) and the latest results of each league
+        (:meth:`recent_matches`) are ingested first, then the schedule is walked back page by page until a page
+        brings no new result, so a sync only fetches what happened since the previous one.
+
+        Parameters
+        ----------
+        esports: `AsyncLolEsports`
+            The api client
+        league_ids: `list` of `int`
+            The leagues to archive
+        tournament_ids: `iterable` of `int`
+            The tournaments to archive completely
+        max_pages: `int`
+            The largest number of schedule pages to walk back, None for no limit. Every page walked is cached like
+            any other response, the limit keeps a first sync of an empty archive from filling the cache
+
+        Returns
+        -------
+        added: `int`
+            The number of new series archived
+        ---
+        """
+        added = 0
+        # the tournaments go first since only their results carry the tournament id
+        for tournament_id in tournament_ids:
+            added += self.ingest(map(Event.from_dict, await esports.matches_with_vods(tournament_id)), tournament_id)
+        for league_id in league_ids:
+            added += self.ingest(map(Event.from_dict, await esports.recent_matches(league_id)))
+        pages = 0
+        schedule = esports.schedule_pages(league_ids, direction='older')
+        try:
+            async for page in schedule:
+                new = self.ingest(page.events)
+                added += new
+                pages += 1
+                # the first page also holds the upcoming events, only stop once an older page is fully archived
+                if (new == 0 and pages > 1) or (max_pages is not None and pages >= max_pages):
+                    break
+        finally:
+            await schedule.aclose()
+        # the columns are rewritten, keep the event loop free meanwhile
+        await asyncio.to_thread(self.flush)
+        return added
+
+    def select(self, team: Optional[str] = None, opponent: Optional[str] = None, league: Optional[str] = None,
+               tournament_id: Optional[int] = None, since: Union[datetime, str, int, None] = None,
+               until: Union[datetime, str, int, None] = None) -> np.ndarray:
+        """Get the rows of the archived series matching every given filter
+
+        Parameters
+        ----------
+        team: `str`
+            The code of a team of the series (ex. T1)
+        opponent: `str`
+            The code of the other team, only used along with ``team``
+        league: `str`
+            The slug of the league (ex. lck, worlds)
+        tournament_id: `int`
+            The id of the tournament
+        since: `datetime` | `str` | `int`
+            The earliest start time, included
+        until: `datetime` | `str` | `int`
+            The latest start time, excluded
+
+        Returns
+        -------
+        rows: `numpy.ndarray`
+            The indexes of the matching rows, by start time
+        ---
+        """
+        start = self.columns['start']
+        low = 0 if since is None else int(np.searchsorted(start, to_epoch(since), side='left'))
+        high = len(start) if until is None else int(np.searchsorted(start, to_epoch(until), side='left'))
+        mask = np.ones(max(high - low, 0), dtype=bool)
+        team_a, team_b = self.columns['team_a'][low:high], self.columns['team_b'][low:high]
+        for code in (team, opponent if team is not None else None):
+            if code is not None:
+                index = self._string_index.get(code.upper(), -1)
+                mask &= (team_a == index) | (team_b == index)
+        if league is not None:
+            mask &= self.columns['league'][low:high] == self._string_index.get(league.lower(), -1)
+        if tournament_id is not None:
+            mask &= self.columns['tournament_id'][low:high] == int(tournament_id)
+        return np.flatnonzero(mask) + low
+
+    def results(self, **filters) -> List[dict]:
+        """Get the archived series matching the filters of :meth:`select` as dictionaries, by start time"""
+        rows = self.select(**filters)
+        columns = {name: self.columns[name][rows].tolist() for name in COLUMNS}
+        return [{
+            'match_id': columns['match_id'][i],
+            'start': datetime.fromtimestamp(columns['start'][i], tz=timezone.utc),
+            'league': self.strings[columns['league'][i]],
+            'tournament_id': columns['tournament_id'][i] or None,
+            'teams': (self.strings[columns['team_a'][i]], self.strings[columns['team_b'][i]]),
+            'games': (columns['games_a'][i], columns['games_b'][i]),
+            'winner': self.strings[columns['team_b' if columns['winner'][i] else 'team_a'][i]],
+        } for i in range(len(rows))]
+
+    def record(self, team: str, **filters) -> Tuple[int, int]:
+        """Get the (wins, losses) of a team in the archived series matching the filters of :meth:`select`
+
+        Example: ``archive.record('T1', opponent='GEN', since='2021-01-01')``
+        """
+        rows = self.select(team=team, **filters)
+        index = self._string_index.get(team.upper(), -1)
+        winners = np.where(self.columns['winner'][rows] == 0, self.columns['team_a'][rows], self.columns['team_b'][rows])
+        wins = int(np.count_nonzero(winners == index))
+        return wins, len(rows) - wins
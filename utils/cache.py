@@ -0,0 +1,510 @@
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, Optional, Tuple
+import utils.constants as consts
+import utils.schemas as schemas
+
+
+def body_digest(body: bytes) -> bytes:
+    """Get a short digest of a raw response body used to detect byte-identical responses"""
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class CacheEntry:
+    """A cached response body
+
+    Parameters
+    ----------
+    data: `Any`
+        The decoded response body
+    size: `int`
+        The size of the raw response body in bytes, used to account for the memory budget
+    stored_at: `float`
+        The unix time at which the response was stored
+    ttl: `float`
+        The number of seconds the response stays fresh
+    etag: `str`
+        The ``ETag`` validator of the response, if any
+    last_modified: `str`
+        The ``Last-Modified`` validator of the response, if any
+    digest: `bytes`
+        The :func:`body_digest` of the raw response body, if known
+
+    ``parsed`` memoizes the models built from ``data`` by each parser so that they are built once per response.
+    """
+    __slots__ = ('data', 'size', 'stored_at', 'ttl', 'etag', 'last_modified', 'digest', 'parsed')
+
+    def __init__(self, data: Any, size: int, stored_at: float, ttl: float,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None, digest: Optional[bytes] = None):
+        self.data = data
+        self.size = size
+        self.stored_at = stored_at
+        self.ttl = ttl
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.parsed = None
+
+    @property
+    def expires_at(self) -> float:
+        return self.stored_at + self.ttl
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Whether the entry is still within its time to live"""
+        return (now if now is not None else time.time()) < self.expires_at
+
+
+class PersistentStore:
+    """A SQLite backed store of raw api responses so that the cache survives restarts
+
+    Writes never run on the event loop: :meth:`save`, :meth:`touch` and :meth:`delete` only queue the statement,
+    and a writer thread executes the queued statements in batches of up to ``batch_size``, committing once per
+    batch. The database runs in WAL mode with ``synchronous=NORMAL`` so that a commit does not wait on a disk flush.
+
+    Parameters
+    ----------
+    path: `str`
+        The path of the SQLite database file
+    batch_size: `int`
+        The largest number of statements committed at once
+    flush_interval: `float`
+        The number of seconds the writer waits for more statements before committing a partial batch
+    """
+    def __init__(self, path: str, batch_size: int = 64, flush_interval: float = 0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._queue: 'queue.Queue[Optional[tuple]]' = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, body BLOB NOT NULL, stored_at REAL NOT NULL)'
+            )
+            # the validator columns were added after the table was first released
+            columns = {row[1] for row in self._conn.execute('PRAGMA table_info(responses)')}
+            for column in ('etag', 'last_modified'):
+                if column not in columns:
+                    self._conn.execute(f'ALTER TABLE responses ADD COLUMN {column} TEXT')
+        return self._conn
+
+    def _enqueue(self, statement: str, params: tuple) -> None:
+        """Queue a write for the writer thread, starting it if needed"""
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name='persistent-store-writer', daemon=True)
+            self._writer.start()
+        self._queue.put((statement, params))
+
+    def _write_loop(self) -> None:
+        """Execute the queued writes in batches until :meth:`close` queues None"""
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+            try:
+                with self._lock:
+                    conn = self._connect()
+                    for statement, params in batch:
+                        conn.execute(statement, params)
+                    conn.commit()
+            except sqlite3.Error as e:
+                print(f'**`ERROR:`** {type(e).__name__} - {e}')
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def save(self, key: str, endpoint: str, body: bytes, stored_at: float,
+             etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Queue the insertion or replacement of the raw body of a request key
+
+        Parameters
+        ----------
+        key: `str`
+            The request key
+        endpoint: `str`
+            The name of the endpoint
+        body: `bytes`
+            The raw response body
+        stored_at: `float`
+            The unix time at which the response was received
+        etag: `str`
+            The ``ETag`` validator of the response
+        last_modified: `str`
+            The ``Last-Modified`` validator of the response
+        """
+        self._enqueue('INSERT OR REPLACE INTO responses (key, endpoint, body, stored_at, etag, last_modified) VALUES (?, ?, ?, ?, ?, ?)',
+                      (key, endpoint, body, stored_at, etag, last_modified))
+
+    def touch(self, key: str, stored_at: float, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Queue the update of the receive time and validators of an unchanged response without rewriting its body"""
+        self._enqueue('UPDATE responses SET stored_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE key = ?',
+                      (stored_at, etag, last_modified, key))
+
+    def delete(self, key: str) -> None:
+        """Queue the deletion of the row of a request key"""
+        self._enqueue('DELETE FROM responses WHERE key = ?', (key,))
+
+    def flush(self) -> None:
+        """Wait until every queued write is committed"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.join()
+
+    def rows(self) -> Iterator[Tuple[str, str, bytes, float, Optional[str], Optional[str]]]:
+        """Iterate over the stored ``(key, endpoint, body, stored_at, etag, last_modified)`` rows, queued writes included"""
+        self.flush()
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT key, endpoint, body, stored_at, etag, last_modified FROM responses'
+            ).fetchall()
+        return iter(rows)
+
+    def close(self) -> None:
+        """Commit the queued writes, stop the writer thread and close the database connection"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._writer = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class ResponseCache:
+    """An in-process LRU cache of api responses with per-endpoint time to live and a byte budget
+
+    Entries are keyed by the request key built by :meth:`utils.lolesports.HTTPClient.make_key`.
+    The least recently used entries are evicted once the total size of the cached bodies exceeds ``max_bytes``.
+
+    Parameters
+    ----------
+    max_bytes: `int`
+        The memory budget of the cached response bodies in bytes
+    ttls: `dict`
+        The time to live in seconds of each endpoint. Defaults to :data:`utils.constants.CACHE_TTLS`
+    default_ttl: `float`
+        The time to live of the endpoints missing from ``ttls``
+    store: `PersistentStore`
+        An optional on-disk store that the responses are written through to and loaded back from by :meth:`load`
+    persist_min_ttl: `float`
+        Only the endpoints with a time to live of at least this many seconds are written to the store,
+        so that fast changing endpoints such as getLive do not cause a write on every poll
+    max_stale: `dict`
+        The hard-stale ceiling in seconds past the time to live of each endpoint, after which :meth:`get_stale`
+        no longer serves the response. Defaults to :data:`utils.constants.CACHE_MAX_STALE`
+    """
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttls: Optional[dict] = None, default_ttl: float = 60,
+                 store: Optional[PersistentStore] = None, persist_min_ttl: float = 60, max_stale: Optional[dict] = None):
+        self.max_bytes = max_bytes
+        self.ttls = dict(consts.CACHE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_stale = dict(consts.CACHE_MAX_STALE if max_stale is None else max_stale)
+        self.store = store
+        self.persist_min_ttl = persist_min_ttl
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def ttl_for(self, endpoint: str) -> float:
+        """Get the time to live in seconds of the given endpoint"""
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Get the entry of a key regardless of its freshness without touching the counters
+
+        Parameters
+        ----------
+        key: `str`
+            The request key
+
+        Returns
+        -------
+        entry: `CacheEntry`
+            The cached entry or None if the key is not cached
+        ---
+        """
+        return self._entries.get(key)
+
+    def get(self, key: str) -> Any:
+        """Get the fresh cached body of a key
+
+        Parameters
+        ----------
+        key: `str`
+            The request key
+
+        Returns
+        -------
+        data: `Any`
+            The decoded response body or None if the key is missing or expired
+        ---
+        """
+        entry = self._entries.get(key)
+        if entry is None or not entry.is_fresh():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.data
+
+    def get_stale(self, key: str, endpoint: str) -> Any:
+        """Get the expired cached body of a key if it is still within the hard-stale ceiling of its endpoint
+
+        Parameters
+        ----------
+        key: `str`
+            The request key
+        endpoint: `str`
+            The name of the endpoint, used to look up the hard-stale ceiling
+
+        Returns
+        -------
+        data: `Any`
+            The decoded response body or None if the key is missing or too stale to be served
+        ---
+        """
+        entry = self._entries.get(key)
+        if entry is None or time.time() >= entry.expires_at + self.max_stale.get(endpoint, 0):
+            return None
+        self._entries.move_to_end(key)
+        self.stale_hits += 1
+        return entry.data
+
+    def set(self, key: str, endpoint: str, data: Any, size: int, stored_at: Optional[float] = None,
+            body: Optional[bytes] = None, etag: Optional[str] = None, last_modified: Optional[str] = None,
+            persist: bool = True) -> Optional[CacheEntry]:
+        """Store a response body and evict the least recently used entries if over budget
+
+        If a store is attached and the raw ``body`` is given, the response is also written to the store.
+
+        Parameters
+        ----------
+        key: `str`
+            The request key
+        endpoint: `str`
+            The name of the endpoint, used to look up the time to live
+        data: `Any`
+            The decoded response body
+        size: `int`
+            The size of the raw response body in bytes
+        stored_at: `float`
+            The unix time at which the response was received. Defaults to now
+        body: `bytes`
+            The raw response body, used to compute its digest and to persist it
+        etag: `str`
+            The ``ETag`` validator of the response
+        last_modified: `str`
+            The ``Last-Modified`` validator of the response
+        persist: `bool`
+            Whether to write the response to the store
+
+        Returns
+        -------
+        entry: `CacheEntry`
+            The stored entry or None if the endpoint is not cacheable or the body is larger than the budget
+        ---
+        """
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0 or size > self.max_bytes:
+            return None
+        self.pop(key)
+        entry = CacheEntry(data, size, time.time() if stored_at is None else stored_at, ttl,
+                           etag=etag, last_modified=last_modified, digest=body_digest(body) if body is not None else None)
+        self._entries[key] = entry
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= evicted.size
+            self.evictions += 1
+        if persist and self.store is not None and body is not None and ttl >= self.persist_min_ttl:
+            self.store.save(key, endpoint, body, entry.stored_at, etag, last_modified)
+        return entry
+
+    def refresh(self, key: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Optional[CacheEntry]:
+        """Mark the entry of a key as fresh again after upstream confirmed that it has not changed
+
+        Parameters
+        ----------
+        key: `str`
+            The request key
+        etag: `str`
+            The new ``ETag`` validator, if upstream sent one
+        last_modified: `str`
+            The new ``Last-Modified`` validator, if upstream sent one
+
+        Returns
+        -------
+        entry: `CacheEntry`
+            The refreshed entry or None if the key is not cached
+        ---
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        entry.stored_at = time.time()
+        entry.etag = etag or entry.etag
+        entry.last_modified = last_modified or entry.last_modified
+        self._entries.move_to_end(key)
+        if self.store is not None and entry.ttl >= self.persist_min_ttl:
+            self.store.touch(key, entry.stored_at, etag, last_modified)
+        return entry
+
+    def load(self) -> int:
+        """Load the responses from the store and delete the ones that can no longer be used
+
+        Expired responses that carry a validator are kept so that they can be revalidated with a conditional request.
+
+        Returns
+        -------
+        loaded: `int`
+            The number of responses loaded into memory
+        ---
+        """
+        if self.store is None:
+            return 0
+        loaded = 0
+        now = time.time()
+        for key, endpoint, body, stored_at, etag, last_modified in self.store.rows():
+            if now >= stored_at + self.ttl_for(endpoint) and not (etag or last_modified):
+                self.store.delete(key)
+                continue
+            try:
+                data = schemas.decode(endpoint, body)
+            except ValueError:
+                self.store.delete(key)
+                continue
+            entry = self.set(key, endpoint, data, len(body), stored_at=stored_at, body=body,
+                             etag=etag, last_modified=last_modified, persist=False)
+            if entry is not None:
+                loaded += 1
+        return loaded
+
+    def pop(self, key: str) -> Optional[CacheEntry]:
+        """Remove a key from the cache
+
+        Returns
+        -------
+        entry: `CacheEntry`
+            The removed entry or None if the key was not cached
+        ---
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+        return entry
+
+    def clear(self) -> None:
+        """Remove every entry from the cache"""
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> dict:
+        """Get the counters of the cache
+
+        Returns
+        -------
+        stats: `dict`
+            The number of entries, bytes used, hits, misses, stale hits, evictions and the hit rate
+        ---
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale_hits': self.stale_hits,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class RenderCache:
+    """Rendered outputs (text, embeds...) of the api data, reused until the data they were rendered from changes
+
+    Every output is stored under a key (ex. the tournament and the kind of output) along with the version of the
+    data it was rendered from; asking for the same key with another version renders it again.
+
+    Parameters
+    ----------
+    max_entries: `int`
+        The number of outputs to keep, the least recently used ones are dropped first
+    """
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Any, Tuple[Any, Any]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_render(self, key: Any, version: Any, render: Callable[[], Any]) -> Any:
+        """Get the output of a key rendered from the given version of the data, rendering it if needed
+
+        Parameters
+        ----------
+        key: `Any`
+            The hashable key of the output
+        version: `Any`
+            The version of the data (ex. a digest of the payload)
+        render: `Callable`
+            A function without arguments rendering the output
+
+        Returns
+        -------
+        output: `Any`
+            The cached or freshly rendered output
+        ---
+        """
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        output = render()
+        self._entries[key] = (version, output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return output
+
+    def clear(self) -> None:
+        """Remove every output"""
+        self._entries.clear()
@@ -8,6 +8,33 @@ ICONS = {
     'lolesports' : 'https://static.lolesports.com/leagues/1693555886600_lolesports_icon_ice-01.png',
 }
 
+# time to live in seconds of the cached api responses for each endpoint
+CACHE_TTLS = {
+    'getLeagues': 6 * 60 * 60,              # leagues only change a few times a year
+    'getTournamentsForLeague': 6 * 60 * 60,
+    'getTeams': 60 * 60,
+    'getStandingsV3': 5 * 60,
+    'getStandings': 5 * 60,
+    'getVods': 30 * 60,
+    'getVodsForHome': 10 * 60,
+    'getSchedule': 60,
+    'getEventList': 60,
+    'getEventDetails': 10,
+    'getLive': 10,
+}
+
+# how many seconds past its time to live a cached response may still be served while it is refreshed in the background
+# (stale-while-revalidate); endpoints missing here are never served stale
+CACHE_MAX_STALE = {
+    'getLeagues': 7 * 24 * 60 * 60,
+    'getTournamentsForLeague': 24 * 60 * 60,
+    'getTeams': 24 * 60 * 60,
+    'getStandingsV3': 60 * 60,
+    'getStandings': 60 * 60,
+    'getSchedule': 10 * 60,
+    'getEventList': 10 * 60,
+}
+
 # contains all the popular regions
 class Region(Enum):
     LCS = 98767991299243165
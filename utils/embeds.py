@@ -0,0 +1,169 @@
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from typing import List, Union
+import discord
+import pytz
+import utils.constants as consts
+from utils.lolesports import Event, parse_timestamp
+
+# the timezone the start times are shown in and the offset of the timestamps of the embeds
+TIMEZONE = 'US/Pacific'
+TIMEZONE_OFFSET = 7
+
+
+@lru_cache(maxsize=None)
+def _get_zone(name: str) -> pytz.BaseTzInfo:
+    return pytz.timezone(name)
+
+
+# the same start times are shown again on every schedule page and command, format each of them once per timezone
+@lru_cache(maxsize=4096)
+def _format_local_time(timestamp: float, timezone: str) -> str:
+    return datetime.fromtimestamp(timestamp, _get_zone(timezone)).strftime("%m/%d/%y, %a %I:%M %p")
+
+
+def convert_timezone(start: Union[datetime, str], timezone: str = TIMEZONE) -> str:
+    """Format a start time in the given timezone (ex. 10/10/23, Tue 01:00 AM)"""
+    # events carry their parsed start time, a raw upstream string is still accepted
+    if isinstance(start, str):
+        try:
+            start = parse_timestamp(start)
+        except ValueError:
+            return "Invalid time format"
+    return _format_local_time(start.timestamp(), timezone)
+
+
+def convert_timedelta(start: Union[datetime, str], show_direction: bool = False) -> str:
+    """Format the time until (or since) a start time (ex. 2 hours 5 minutes from now)"""
+    start_time = parse_timestamp(start) if isinstance(start, str) else start
+    now = datetime.now(dt_timezone.utc)
+    diff = start_time - now
+    # flip the sign if the difference is negative
+    if diff.total_seconds() < 0:
+        diff = -diff
+        direction = "ago"
+    else:
+        direction = "from now"
+    days = diff.days
+    hours, remainder = divmod(diff.seconds, 3600)
+    # minutes = remainder // 60
+    minutes, seconds = divmod(remainder, 60)
+    output = []
+    if days > 0:
+        output.append(f"{days} days")
+    if hours > 0:
+        output.append(f"{hours} hours")
+    if minutes > 0 and days < 1:    # only show minutes if the event is less than 1 day away
+        output.append(f"{minutes} minutes")
+        if seconds > 0 and minutes < 2:   # only show seconds if the event is less than 2 minutes away
+            output.append(f"{seconds} seconds")
+    if show_direction:
+        output.append(direction)
+    return ' '.join(output)
+
+
+def create_live_event_embeds(events: List[Event], all_streams: bool = False, timezone_name: str = TIMEZONE) -> List[discord.Embed]:
+    """Create the embeds of the live events (the /live command and the live notifications), skipping the TBD matches"""
+    embeds = []
+    for event in events:
+        if event.type == 'show':
+            time_delta = convert_timedelta(event.start, show_direction=True)
+            embed = discord.Embed(title=f"{event.league.name} Preshow",
+                description = f"Live now - {time_delta if time_delta != 'past' else 'In progress'}", 
+                color = discord.Color.random(),
+                # set the timestamp to the current time in PST time
+                timestamp = datetime.now(dt_timezone(timedelta(hours=TIMEZONE_OFFSET))))
+            embed.set_author(name=event.league.name, icon_url=consts.ICONS.get('lolesports'))
+            embed.set_thumbnail(url=event.league.image)
+            embed.set_footer(text="Timezone in {}".format(timezone_name))
+            embed.add_field(name='Schedule', value= f"{convert_timezone(event.start, timezone_name)}", 
+            inline=False)
+            embed.add_field(name='League', value=event.league.name, inline=True)
+            embed.add_field(name='Event ID', value=event.id, inline=True)
+        else:
+            match = event.match
+            teams = match.teams
+            # skip the event if both team codes are "TBD"
+            if match.is_tbd:
+                continue
+            # set the game_state as description
+            current_game = match.current_game
+            game_state = f"Currently in game {current_game}" if current_game is not None else 'Unstarted'
+            embed = discord.Embed(title=f"{event.league.name} - {event.block_name.title()}",
+                description = game_state, #set description to the current match number
+                color=discord.Color.teal(),
+                # url=f"https://lolesports.com/schedule?leagues={event['league']['slug']}",
+                # set the timestamp to the current time in PST time
+                timestamp = datetime.now(dt_timezone(timedelta(hours=TIMEZONE_OFFSET)))
+            )
+            embed.set_author(name=' vs '.join([team.code for team in teams]), icon_url=teams[0].image)
+            embed.set_thumbnail(url=teams[1].image)
+            embed.set_footer(text="Powered by LoL Esports", icon_url= event.league.image)
+            embed.add_field(name='Schedule',
+                            value= f"{convert_timezone(event.start, timezone_name)}",
+                            inline=True)
+            embed.add_field(name='\u200b', value='\u200b', inline=True)
+            # add a stream link field which link to the official lolesports stream
+            embed.add_field(name='Stream', value=f"[Watch live](https://lolesports.com/live/worlds/riotgames)", inline=True)
+            # add field for each team
+            for index, team in enumerate(teams):
+                    embed.add_field(name=f'Team {index+1}', value=f"{team.name}", inline=True)
+            # insert the field for the scores (ex. team1 0-0 team2) inbetween the two teams
+            scores_str = f"{teams[0].game_wins} - {teams[1].game_wins}"
+            embed.insert_field_at(4, name='Scores', value=f"||{teams[0].code} {scores_str} {teams[1].code}||", inline=True)
+            # embed.add_field(name='League', value=event['league']['name'], inline=True)
+            # stage field
+            embed.add_field(name='Stage', value=event.block_name.title(), inline=True)
+            # add a blank field here
+            embed.add_field(name='\u200b', value='\u200b', inline=True)
+            # add a strategy field with the format of bestOf 5
+            embed.add_field(name='Format', value=f"{match.strategy_type} {match.strategy_count}", inline=True)
+            # add a full list of streams to the streams field
+        if all_streams:
+            official_streams = []
+            for stream in event.streams:
+                offcial_link = f"https://lolesports.com/live/worlds/{stream['parameter']}"
+                official_streams.append(f"[`{stream['mediaLocale']['locale']}`]({offcial_link}) in {stream['mediaLocale']['englishName']}")
+            mid_point = math.ceil(len(official_streams)/2)
+            embed.add_field(name='All Streams', value='\n'.join(official_streams[:mid_point]), inline=True)
+            embed.add_field(name='\u200b', value='\n'.join(official_streams[mid_point:]), inline=True)
+
+        # add to the embeds list
+        embeds.append(embed)
+    return embeds
+
+
+def create_upcoming_event_embeds(events: List[Event], timezone_name: str = TIMEZONE) -> List[discord.Embed]:
+    """Create the embeds of the upcoming matches (the /upnext command and its broadcast), skipping the TBD matches"""
+    embeds = []
+    # loop through the events and send the embeds
+    for event in events:
+        teams = event.match.teams
+        # skip the event if both team codes are "TBD"
+        if event.is_tbd:
+            continue
+        embed = discord.Embed(title=event.league.name,
+            description = f"Match starts in `{convert_timedelta(event.start)}`",
+            color=discord.Color.teal(),
+            # set the timestamp to the current time in PST time
+            timestamp = datetime.now(dt_timezone(timedelta(hours=TIMEZONE_OFFSET)))
+        )
+        embed.set_author(name=' vs '.join([team.code for team in teams]), 
+                         icon_url=teams[0].image,
+        )
+        embed.set_thumbnail(url=teams[1].image)
+        embed.set_footer(text="Powered by LoL Esports", icon_url=consts.ICONS.get('worlds'))
+        embed.add_field(name='Start Time',
+                        value= f"{convert_timezone(event.start, timezone_name)}", 
+                        inline=True)
+        # add a blank field here
+        embed.add_field(name='\u200b', value='\u200b', inline=True)
+        embed.add_field(name='Schedule', value=f"[Click here](https://lolesports.com/schedule?leagues={event.league.slug})", inline=True)
+        # add field for each team
+        for index, team in enumerate(teams):
+            embed.add_field(name=f'Team {index+1}', value=team.code, inline=True)
+        # add a blank field at the second to last position
+        embed.insert_field_at(-1, name='\u200b', value='\u200b', inline=True)
+        embeds.append(embed)
+    return embeds
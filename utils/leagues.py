@@ -0,0 +1,180 @@
+import re
+from enum import Enum
+from typing import Dict, List, Optional, Union
+import utils.constants as consts
+from utils.cache import body_digest
+
+
+def league_key(text: str) -> str:
+    """Normalize a league name or slug into the name of its :class:`utils.constants.AllRegion` member (ex. All-Star Event -> ALL_STAR_EVENT)"""
+    return re.sub(r'[^0-9A-Z]+', '_', text.upper()).strip('_')
+
+
+def sort_leagues(leagues: list) -> list:
+    """ A helper to sort the leagues by priority and bring the 2 semi major leagues (VCS, PCS) below the 4 major leagues
+
+    Parameters
+    ----------
+    leagues: `list`
+        A list of raw esports leagues
+
+    Returns
+    -------
+    leagues: `list`
+        A list of sorted esports leagues
+    ---
+    """
+    sorted_leagues = sorted(leagues, key=lambda league: league['priority'])
+    # further sort the leagues to bring the 2 semi major leagues to the top
+    insert_index = sum(1 for league in leagues if league['priority'] < 202)    # insert below the 4 major leagues
+    # Find the position of "VCS" and move it with "PCS" (the league below it)
+    vcs_index = [league['name'] for league in sorted_leagues].index('VCS')
+    rows_to_move = sorted_leagues[vcs_index:vcs_index+2]
+    del sorted_leagues[vcs_index:vcs_index+2]
+    sorted_leagues[insert_index:insert_index] = rows_to_move
+    return sorted_leagues
+
+
+def group_leagues(leagues: list) -> Optional[tuple]:
+    """ A helper to process the sorted leagues data and sort them into various sub leagues
+
+    Parameters
+    ----------
+    leagues: `list`
+        A list of esports leagues sorted by :func:`sort_leagues`
+
+    Returns
+    -------
+    sub_leagues: `tuple`
+        A tuple of sub leagues :attr:`list` in the following order: major_leagues, popular_leagues, primary_leagues
+    ---
+    """
+    if leagues is None:
+        return None
+    try:
+        # precompute the position of the first league of each name
+        positions = {}
+        for index, league in enumerate(leagues):
+            positions.setdefault(league['name'], index)
+        # Extract "VCS" and "PCS" (the league below it)
+        vcs_index = positions['VCS']
+        semi_leagues = leagues[vcs_index:vcs_index+2]
+        # Exclude LCL, LCO (the league below LCL) and TCL from the minor leagues
+        excluded = {positions['LCL'], positions['LCL'] + 1, positions['TCL']}
+        # 6 minor_leagues & international: CBLOL, LLA, LJL, WORLDS, MSI, ALL_STAR_EVENT
+        minor_leagues = [league for index, league in enumerate(leagues)
+                         if 201 < league['priority'] < 1000 and index not in excluded]
+
+        # 4 major leagues: LCS, LEC, LCK, LPL
+        major_leagues = [league for league in leagues if league['priority'] < 202]
+        # 6 popular leagues: LCS, LEC, LCK, LPL, PCS, VCS
+        popular_leagues = major_leagues + semi_leagues
+        # 13 primary leagues: LCS, LEC, LCK, LPL, PCS, VCS, CBLOL, LLA, LJL, WORLDS, MSI, ALL_STAR_EVENT, WQS
+        wqs = [league for league in leagues if league['slug'] == 'wqs'] # world qualifier series
+        primary_leagues = major_leagues + semi_leagues + minor_leagues + wqs
+    except Exception as e:
+        print(f'**`ERROR:`** {type(e).__name__} - {e}')
+        return None
+    else:
+        return major_leagues, popular_leagues, primary_leagues
+
+
+# the names of the region enums, still accepted once the registry is built from upstream
+ENUM_ALIASES = {region.name: region.value for enum in (consts.AllRegion, consts.Region) for region in enum}
+
+
+class LeagueRegistry:
+    """The esports leagues indexed by id, slug and name, with their groupings computed once
+
+    The registry is built from a getLeagues response so new leagues are known without code changes. Until the
+    first response is loaded it is seeded with the leagues of the region enums of :mod:`utils.constants`.
+
+    Parameters
+    ----------
+    leagues: `list` of `dict`
+        The raw leagues in the upstream order
+    major_leagues: `list` of `dict`
+        The major leagues to use when the leagues cannot be grouped (ex. the seed has no priorities)
+    aliases: `dict`
+        Extra names of the leagues mapped to their id (ex. the names of the region enums)
+    """
+    # the fields of a league shown by the bot, the fingerprint only changes along with them
+    FINGERPRINT_FIELDS = ('id', 'slug', 'name', 'region', 'image', 'priority')
+
+    def __init__(self, leagues: List[dict], major_leagues: Optional[List[dict]] = None, aliases: Optional[Dict[str, int]] = None):
+        self.raw = leagues
+        self.fingerprint = body_digest(repr([tuple(league.get(field) for field in self.FINGERPRINT_FIELDS)
+                                             for league in leagues]).encode())
+        try:
+            self.leagues = sort_leagues(leagues)
+        except (KeyError, TypeError, ValueError):
+            self.leagues = list(leagues)
+        groups = group_leagues(self.leagues) if self.leagues and self.leagues[0].get('priority') is not None else None
+        if groups is None:
+            groups = (major_leagues or [], [], [])
+        self.major, self.popular, self.primary = groups
+        self._by_id: Dict[int, dict] = {}
+        self._by_key: Dict[str, dict] = {}
+        for league in self.leagues:
+            self._by_id.setdefault(int(league['id']), league)
+            for alias in (league['name'], league['slug']):
+                if alias:
+                    self._by_key.setdefault(league_key(alias), league)
+        for alias, league_id in (aliases or {}).items():
+            if league_id in self._by_id:
+                self._by_key.setdefault(league_key(alias), self._by_id[league_id])
+
+    @classmethod
+    def from_enums(cls, *enums: Enum, majors: int = 4) -> 'LeagueRegistry':
+        """Seed a registry with the members of the given region enums, the first ``majors`` members being the major leagues"""
+        leagues, seen = [], set()
+        for enum in enums:
+            for region in enum:
+                if region.value not in seen:
+                    seen.add(region.value)
+                    leagues.append({'id': str(region.value), 'slug': region.name.lower(), 'name': region.name,
+                                    'region': None, 'image': None, 'priority': None})
+        return cls(leagues, major_leagues=leagues[:majors])
+
+    def __len__(self) -> int:
+        return len(self.leagues)
+
+    def __iter__(self):
+        return iter(self.leagues)
+
+    def get(self, league: Union[str, int]) -> Optional[dict]:
+        """Get a league by id, slug or name (case insensitive)
+
+        Parameters
+        ----------
+        league: `str` or `int`
+            The id, slug or name of the league (ex. 98767991310872058, lck, LCK, all-star, ALL_STAR_EVENT)
+
+        Returns
+        -------
+        league: `dict`
+            The raw league, or None if there is no such league
+        ---
+        """
+        if isinstance(league, int) or str(league).isdigit():
+            return self._by_id.get(int(league))
+        return self._by_key.get(league_key(league))
+
+    def id_of(self, league: Union[str, int]) -> Optional[int]:
+        """Get the id of a league by id, slug or name, or None if there is no such league"""
+        league = self.get(league)
+        return None if league is None else int(league['id'])
+
+    def image_url(self, league: Union[str, int]) -> Optional[str]:
+        """Get the image url of a league by id, slug or name, or None if there is no such league"""
+        league = self.get(league)
+        return None if league is None else league.get('image')
+
+    def major_ids(self) -> List[int]:
+        """Get the ids of the major leagues"""
+        return [int(league['id']) for league in self.major]
+
+
+def parse_league_registry(data: dict) -> LeagueRegistry:
+    """Build the registry of a getLeagues response"""
+    return LeagueRegistry(data['data']['leagues'], aliases=ENUM_ALIASES)
@@ -0,0 +1,114 @@
+import asyncio
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+
+class TransitionKind(Enum):
+    SERIES_STARTED = 'series_started'
+    GAME_STARTED = 'game_started'
+    GAME_ENDED = 'game_ended'
+    SCORE_CHANGED = 'score_changed'
+    SERIES_ENDED = 'series_ended'
+    SHOW_STARTED = 'show_started'
+    SHOW_ENDED = 'show_ended'
+
+
+@dataclass
+class Transition:
+    """A change of a live event between two polls
+
+    ``event`` is the latest snapshot of the event (the last one seen live for the ``*_ENDED`` kinds) and ``game``
+    the number of the game for the game transitions
+    """
+    __slots__ = ('kind', 'event', 'game')
+    kind: TransitionKind
+    event: Any
+    game: Optional[int]
+
+
+def scores(event: Any) -> tuple:
+    """Get the game wins of the teams of a match event"""
+    return tuple(team.game_wins for team in event.match.teams) if event.match is not None else ()
+
+
+class LiveTracker:
+    """The live events of every league kept between two polls, published as typed transitions
+
+    Every poll is compared with the previous snapshot. An event whose model is the same object as in the
+    previous snapshot is unchanged (the models of an unchanged response are built once and shared, see
+    :meth:`utils.lolesports.HTTPClient.get`) and costs nothing more, so a poll only does work for the events that
+    changed. Consumers are coroutine functions called with the transitions of a poll, only when there are some.
+    """
+    def __init__(self):
+        self.snapshot: Dict[int, Any] = {}
+        self.consumers: List[Callable[[List[Transition]], Awaitable[Any]]] = []
+
+    def subscribe(self, consumer: Callable[[List[Transition]], Awaitable[Any]]) -> None:
+        """Register a coroutine function called with the transitions of every poll that has some"""
+        self.consumers.append(consumer)
+
+    def diff(self, events: Iterable[Any]) -> List[Transition]:
+        """Replace the snapshot by the given live events and get the transitions from the previous one
+
+        Parameters
+        ----------
+        events: `iterable` of `Event`
+            The events live right now (ex. :meth:`utils.lolesports.AsyncLolEsports.live_events`)
+
+        Returns
+        -------
+        transitions: `list` of `Transition`
+            The transitions by event, in the order of the events
+        ---
+        """
+        current = {event.id: event for event in events}
+        transitions = []
+        for event_id, event in current.items():
+            previous = self.snapshot.get(event_id)
+            if previous is event:
+                continue
+            if previous is None:
+                kind = TransitionKind.SHOW_STARTED if event.type == 'show' else TransitionKind.SERIES_STARTED
+                transitions.append(Transition(kind, event, None))
+                continue
+            if event.match is None or previous.match is None:
+                continue
+            previous_games = dict(previous.match.games)
+            for number, state in event.match.games:
+                if state == previous_games.get(number):
+                    continue
+                if state == 'inProgress':
+                    transitions.append(Transition(TransitionKind.GAME_STARTED, event, number))
+                elif state == 'completed':
+                    transitions.append(Transition(TransitionKind.GAME_ENDED, event, number))
+            if scores(event) != scores(previous):
+                transitions.append(Transition(TransitionKind.SCORE_CHANGED, event, None))
+            if event.match.state == 'completed' and previous.match.state != 'completed':
+                transitions.append(Transition(TransitionKind.SERIES_ENDED, event, None))
+        for event_id in self.snapshot.keys() - current.keys():
+            previous = self.snapshot[event_id]
+            if previous.type == 'show':
+                transitions.append(Transition(TransitionKind.SHOW_ENDED, previous, None))
+            elif previous.match is None or previous.match.state != 'completed':
+                # a series that ended between two polls just leaves the live events
+                transitions.append(Transition(TransitionKind.SERIES_ENDED, previous, None))
+        self.snapshot = current
+        return transitions
+
+    async def update(self, events: Iterable[Any]) -> List[Transition]:
+        """Diff the given live events with the snapshot and publish the transitions to every consumer
+
+        Returns
+        -------
+        transitions: `list` of `Transition`
+            The published transitions
+        ---
+        """
+        transitions = self.diff(events)
+        if transitions and self.consumers:
+            results = await asyncio.gather(*(consumer(transitions) for consumer in self.consumers), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f'**`ERROR:`** {type(result).__name__} - {result}')
+        return transitions
@@ -1,22 +1,315 @@
 import os
+import sys
+import time
+import asyncio
 import requests
+import aiohttp
 from dotenv import load_dotenv
-from enum import Enum
-import pandas as pd
-from typing import Optional, Union, List, Literal
-# from constants import Region
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Optional, Union, List, Literal
+import utils.schemas as schemas
+from utils.cache import ResponseCache, PersistentStore, RenderCache, body_digest
+from utils.resilience import APIError, CircuitOpenError, CircuitBreaker, RetryPolicy
+from utils.teams import TeamEntry, TeamRegistry
+from utils.standings import StandingsEngine
+from utils.schedule import ScheduleIndex
+import utils.constants as consts
+from utils.leagues import ENUM_ALIASES, LeagueRegistry, group_leagues, parse_league_registry, sort_leagues
+from utils.constants import Region
+
+if TYPE_CHECKING:
+    # numpy is only loaded once the head-to-head results are asked for
+    from utils.analytics import HeadToHead
+
 load_dotenv()
-class Region(Enum):
-    LPL = 98767991314006698
-    LCK = 98767991310872058
-    LEC = 98767991302996019
-    LCS = 98767991299243165
-    PCS = 104366947889790212
-    WORLDS = 98767975604431411
-    MSI = 98767991325878492
-    WQS = 110988878756156222
+
+
+# interning the strings that repeat across thousands of events (team names, codes, slugs, image urls, league names)
+# so that every model refers to a single copy of each
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass
+class League:
+    """A compact esports league
+
+    Only ``name``, ``slug`` and ``image`` are known for the league embedded in an event; the other fields are None
+    """
+    __slots__ = ('id', 'slug', 'name', 'region', 'image', 'priority')
+    id: Optional[int]
+    slug: str
+    name: str
+    region: Optional[str]
+    image: str
+    priority: Optional[int]
+
+    @classmethod
+    def from_dict(cls, league: dict) -> 'League':
+        return cls(
+            int(league['id']) if league.get('id') else None,
+            _intern(league.get('slug')),
+            _intern(league.get('name')),
+            _intern(league.get('region')),
+            _intern(league.get('image')),
+            league.get('priority'),
+        )
+
+
+@dataclass
+class Tournament:
+    """A compact tournament of a league"""
+    __slots__ = ('id', 'slug', 'start_date', 'end_date', 'league_id')
+    id: int
+    slug: str
+    start_date: Optional[str]
+    end_date: Optional[str]
+    league_id: Optional[int]
+
+    @classmethod
+    def from_dict(cls, tournament: dict, league_id: Optional[int] = None) -> 'Tournament':
+        return cls(int(tournament['id']), _intern(tournament.get('slug', '')),
+                   tournament.get('startDate'), tournament.get('endDate'), league_id)
+
+
+@dataclass
+class TeamRef:
+    """A compact reference to a team as it appears in a match or a ranking
+
+    ``game_wins`` and ``outcome`` are the result of the team in the match, ``wins`` and ``losses`` its record
+    """
+    __slots__ = ('name', 'code', 'slug', 'image', 'game_wins', 'outcome', 'wins', 'losses')
+    name: str
+    code: str
+    slug: Optional[str]
+    image: str
+    game_wins: int
+    outcome: Optional[str]
+    wins: int
+    losses: int
+
+    @classmethod
+    def from_dict(cls, team: dict) -> 'TeamRef':
+        result = team.get('result') or {}
+        record = team.get('record') or {}
+        return cls(
+            _intern(team.get('name')),
+            _intern(team.get('code')),
+            _intern(team.get('slug')),
+            _intern(team.get('image')),
+            result.get('gameWins') or 0,
+            _intern(result.get('outcome')),
+            record.get('wins') or 0,
+            record.get('losses') or 0,
+        )
+
+
+@dataclass
+class Match:
+    """A compact match between two teams
+
+    ``games`` is a tuple of ``(number, state)`` pairs, only known for live events
+    """
+    __slots__ = ('id', 'state', 'teams', 'strategy_type', 'strategy_count', 'games')
+    id: int
+    state: Optional[str]
+    teams: tuple
+    strategy_type: Optional[str]
+    strategy_count: Optional[int]
+    games: tuple
+
+    @classmethod
+    def from_dict(cls, match: dict) -> 'Match':
+        strategy = match.get('strategy') or {}
+        return cls(
+            int(match['id']) if match.get('id') else 0,
+            _intern(match.get('state')),
+            tuple(TeamRef.from_dict(team) for team in match.get('teams', [])),
+            _intern(strategy.get('type')),
+            strategy.get('count'),
+            tuple((game['number'], _intern(game['state'])) for game in match.get('games', [])),
+        )
+
+    @property
+    def is_tbd(self) -> bool:
+        """Whether both teams of the match are still to be decided"""
+        return len(self.teams) == 2 and self.teams[0].code == 'TBD' and self.teams[1].code == 'TBD'
+
+    @property
+    def current_game(self) -> Optional[int]:
+        """The number of the game in progress, if any"""
+        for number, state in self.games:
+            if state == 'inProgress':
+                return number
+        return None
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an upstream iso 8601 time (ex. 2023-10-10T08:00:00Z or 2023-10-10T08:00:00.000Z) into an aware utc datetime"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+@dataclass
+class Event:
+    """A compact scheduled or live event, either a match or a show
+
+    The start time is parsed once when the event is built: ``start`` is the aware utc datetime and ``timestamp``
+    the unix time, ``start_time`` keeps the upstream string.
+    ``streams`` keeps the raw stream dicts since they are only read when listing the streams of a live event
+    """
+    __slots__ = ('id', 'start_time', 'start', 'timestamp', 'state', 'type', 'block_name', 'league', 'match', 'streams')
+    id: int
+    start_time: str
+    start: datetime
+    timestamp: float
+    state: Optional[str]
+    type: str
+    block_name: Optional[str]
+    league: League
+    match: Optional[Match]
+    streams: tuple
+
+    @classmethod
+    def from_dict(cls, event: dict) -> 'Event':
+        start = parse_timestamp(event['startTime'])
+        return cls(
+            int(event['id']) if event.get('id') else int(event['match']['id']),
+            event['startTime'],
+            start,
+            start.timestamp(),
+            _intern(event.get('state')),
+            _intern(event.get('type', 'match')),
+            _intern(event.get('blockName')),
+            League.from_dict(event.get('league') or {}),
+            Match.from_dict(event['match']) if event.get('match') else None,
+            tuple(event.get('streams') or ()),
+        )
+
+    @property
+    def is_tbd(self) -> bool:
+        """Whether the event is a match whose teams are both still to be decided"""
+        return self.match is not None and self.match.is_tbd
+
+
+@dataclass
+class StandingRow:
+    """A compact row of the standings of a tournament"""
+    __slots__ = ('ordinal', 'team', 'wins', 'losses')
+    ordinal: int
+    team: TeamRef
+    wins: int
+    losses: int
+
+    @classmethod
+    def from_dict(cls, ranking: dict) -> 'StandingRow':
+        team = TeamRef.from_dict(ranking['teams'][0])  # only one team per slot
+        return cls(ranking['ordinal'], team, team.wins, team.losses)
+
+
+@dataclass
+class Standing:
+    """The regular season standings of a tournament
+
+    ``version`` is a digest of the rows, it only changes when the standings do
+    """
+    __slots__ = ('season', 'rows', 'version')
+    season: str
+    rows: List[StandingRow]
+    version: bytes
+
+    @classmethod
+    def from_rankings(cls, season: str, rankings: List[dict]) -> 'Standing':
+        rows = [StandingRow.from_dict(ranking) for ranking in rankings]
+        version = body_digest(repr([(row.ordinal, row.team.name, row.team.code, row.wins, row.losses) for row in rows]).encode())
+        return cls(_intern(season), rows, version)
+
+
+@dataclass
+class SchedulePage:
+    """A page of the schedule with the tokens of its neighbouring pages (None at either end of the schedule)"""
+    __slots__ = ('events', 'older', 'newer')
+    events: List[Event]
+    older: Optional[str]
+    newer: Optional[str]
+
+
+def parse_events(data: dict) -> List[Event]:
+    """Build the events of a getLive, getSchedule, getVods or getVodsForHome response"""
+    return [Event.from_dict(event) for event in data['data']['schedule']['events']]
+
+
+def parse_schedule_page(data: dict) -> SchedulePage:
+    """Build the page of a getSchedule response"""
+    schedule = data['data']['schedule']
+    pages = schedule.get('pages') or {}
+    return SchedulePage([Event.from_dict(event) for event in schedule['events']], pages.get('older'), pages.get('newer'))
+
+
+def parse_event_list(data: dict) -> Optional[List[Event]]:
+    """Build the events of a getEventList response, None if there are no events"""
+    if not data['data']['esports']:
+        return None
+    return [Event.from_dict(event) for event in data['data']['esports']['events']]
+
+
+def parse_schedule_index(data: dict) -> ScheduleIndex:
+    """Build the start time index of a getLive, getSchedule, getVods or getVodsForHome response"""
+    return ScheduleIndex(parse_events(data))
+
+
+def parse_event_list_index(data: dict) -> ScheduleIndex:
+    """Build the start time index of a getEventList response, empty if there are no events"""
+    return ScheduleIndex(parse_event_list(data) or ())
+
+
+def parse_leagues(data: dict) -> List[League]:
+    """Build the leagues of a getLeagues response"""
+    return [League.from_dict(league) for league in data['data']['leagues']]
+
+
+def parse_tournaments(data: dict) -> List[Tournament]:
+    """Build the tournaments of a getTournamentsForLeague response"""
+    return [Tournament.from_dict(tournament, int(league['id']) if league.get('id') else None)
+            for league in data['data']['leagues'] for tournament in league.get('tournaments', [])]
+
+
+def parse_team_entries(data: dict) -> List[TeamEntry]:
+    """Build the registry entries of a getTeams response"""
+    return [TeamEntry.from_dict(team) for team in data['data']['teams'] if team.get('slug')]
+
+
+def parse_matches(data: dict) -> List[Match]:
+    """Build the regular season matches of a getStandings response"""
+    return [Match.from_dict(match) for match in data['data']['standings'][0]['stages'][0]['sections'][0]['matches']]
+
+
+def parse_head_to_head(data: dict) -> 'HeadToHead':
+    """Build the head-to-head matrices of the regular season matches of a getStandings response"""
+    from utils.analytics import HeadToHead
+    return HeadToHead.from_matches(data['data']['standings'][0]['stages'][0]['sections'][0]['matches'])
+
+
+def parse_event_details_match(data: dict) -> Optional[Match]:
+    """Build the match of a getEventDetails response, or None if the event is not a match"""
+    event = data['data']['event']
+    match = event.get('match')
+    if not match:
+        return None
+    return Match.from_dict({**match, 'id': match.get('id') or event['id']})
+
+
+def parse_standings(data: dict) -> List[Standing]:
+    """Build the regular season standings of a getStandingsV3 response"""
+    return [Standing.from_rankings(season, rankings)
+            for standing in LolEsports._parse_rankings(data['data']['standings'])
+            for season, rankings in standing.items()]
+
 
 class LolEsports:
+    # the leagues by id, slug and name, seeded with the region enums until a getLeagues response is loaded
+    league_registry = LeagueRegistry.from_enums(consts.AllRegion, consts.Region)
+
     def __init__(self, region: str = 'WORLDS', season: str = 'summer_2023'):
         self.api_base = os.getenv('API_BASE')
         self.headers = {
@@ -24,8 +317,10 @@ class LolEsports:
             'Referer': 'https://lolesports.com/',
             "x-api-key": os.getenv('X_API_KEY')
         }
-        self.league = Region[region.upper()]
-        self.league_id = self.league.value
+        self.league = self.league_registry.get(region)
+        if self.league is None:
+            raise KeyError(region)
+        self.league_id = int(self.league['id'])
         self.timeframe = season
         self.tournament_id = None
         self.teams = None
@@ -48,13 +343,11 @@ class LolEsports:
         Raises
         ------
         ValueError
-            If the input league id is not in the Region enum class
+            If the input league id is not in the league registry
         """
-        if league_id not in [region.value for region in Region]:
-            raise ValueError(f'Invalid league id. Expected one of {Region.__members__.keys()}')
-        else:
-            league = Region(league_id)
-            return cls(league.name)
+        if cls.league_registry.get(league_id) is None:
+            raise ValueError(f'Invalid league id: {league_id}')
+        return cls(str(league_id))
 
     def get_league_id(self) -> int:
         """Get the league id
@@ -234,72 +527,23 @@ class LolEsports:
         print(response, response.url.split('/')[-1])   # print the url slug and the response code
         try:
             leagues = response.json()['data']['leagues'] # raw leagues data
-            df = pd.DataFrame(leagues)
             if is_sorted:
-                sorted_df = df.sort_values(by=['priority']).reset_index(drop=True)
-
-                # further sort the leagues to bring the 2 semi major leagues to the top
-                insert_index = len(df.loc[df['priority'] < 202])    # insert below the 4 major leagues
-                # Find the index of the row with "VCS" in the name column
-                vcs_index = sorted_df[sorted_df['name'] == 'VCS'].index[0]
-                # Extract the row with "VCS" and "PCS" (the row below it)
-                rows_to_move = sorted_df.loc[vcs_index:vcs_index+1]
-                # Delete the rows from their original positions
-                sorted_df = sorted_df.drop(rows_to_move.index)
-                # Insert the rows at index 4
-                sorted_df = pd.concat([sorted_df.iloc[:insert_index], rows_to_move, sorted_df.iloc[insert_index:]], ignore_index=True)
-                # convert the dataframe to a list of dictionaries 
-                leagues = sorted_df.to_dict(orient='records')
+                leagues = self._sort_leagues(leagues)
         except Exception as e:
             print(f'**`ERROR:`** {type(e).__name__} - {e}')
             return None
         else:
             return leagues
     
-    # create a helper function to process the league data and get the sub leagues
-    def _get_sub_leagues(self, leagues: list) -> tuple:
-        """ A helper to process the leagues data and sort them into various sub leagues
-
-        Parameters
-        ----------
-        leagues: `list`
-            A list of esports leagues
-
-        Returns
-        -------
-        sub_leagues: `tuple`
-            A tuple of sub leagues :attr:`list` in the following order: major_leagues, popular_leagues, primary_leagues
-        ---
-        """
-        # leagues = self.leagues(is_sorted=True)
-        leagues_df = pd.DataFrame(leagues)
-        if leagues is None:
-            return None
-        try:
-            # Find the index of the row with "VCS" in the name column
-            vcs_index = leagues_df[leagues_df['name'] == 'VCS'].index[0]
-            # Extract the row with "VCS" and "PCS" (the row below it)
-            semi_leagues = leagues_df.loc[vcs_index:vcs_index+1]
-            # 6 minor_leagues & international: CBLOL, LLA, LJL, WORLDS, MSI, ALL_STAR_EVENT
-            minor_leagues = leagues_df.loc[(leagues_df['priority'] < 1000) & (leagues_df['priority'] > 201)]
-            # Exclude LCL, LCO and TCL from the minor leagues
-            lcl_index = minor_leagues.loc[minor_leagues['name'] == 'LCL'].index[0]
-            tcl_index = minor_leagues.loc[minor_leagues['name'] == 'TCL'].index[0]
-            minor_leagues = minor_leagues.drop([lcl_index, lcl_index+1, tcl_index]).reset_index(drop=True)
-
-            # 4 major leagues: LCS, LEC, LCK, LPL
-            major_leagues = leagues_df.loc[leagues_df['priority'] < 202]
-            # 6 popular leagues: LCS, LEC, LCK, LPL, PCS, VCS
-            popular_leagues = pd.concat([major_leagues, semi_leagues], ignore_index=True)
-            # 13 primary leagues: LCS, LEC, LCK, LPL, PCS, VCS, CBLOL, LLA, LJL, WORLDS, MSI, ALL_STAR_EVENT, WQS
-            wqs = leagues_df[leagues_df['slug'] == 'wqs'] # world qualifier series
-            primary_leagues = pd.concat([major_leagues, semi_leagues, minor_leagues, wqs], ignore_index=True)
-        except Exception as e:
-            print(f'**`ERROR:`** {type(e).__name__} - {e}')
-            return None
-        else:
-            return major_leagues.to_dict(orient='records'), popular_leagues.to_dict(orient='records'), primary_leagues.to_dict(orient='records')
+    @staticmethod
+    def _sort_leagues(leagues: list) -> list:
+        """ A helper to sort the leagues by priority, see :func:`utils.leagues.sort_leagues`"""
+        return sort_leagues(leagues)
 
+    @staticmethod
+    def _get_sub_leagues(leagues: list) -> tuple:
+        """ A helper to sort the leagues into the major, popular and primary leagues, see :func:`utils.leagues.group_leagues`"""
+        return group_leagues(leagues)
 
     def get_image_url(self, league_name: str) -> str:
         """Get the image url of a given league
@@ -315,11 +559,12 @@ class LolEsports:
             The image url of the league
         ---
         """
-        league_data = self.leagues(is_sorted=True)
-        for league in league_data:
-            if league['name'] == league_name.upper():
-                return league['image']
-        return None  # Return None if no match is found
+        if self.league_registry.image_url(league_name) is None:
+            # the seed has no images, load the leagues
+            leagues = self.leagues()
+            if leagues is not None:
+                LolEsports.league_registry = LeagueRegistry(leagues, aliases=ENUM_ALIASES)
+        return self.league_registry.image_url(league_name)
 
 
     # now update the parameters to add the "timeframe" as an optional argument; when it is provided, return the tournaments that match with the timeframe, otherwise the raw tournament data
@@ -464,6 +709,23 @@ class LolEsports:
         response = requests.get(url, params=payload, headers=self.headers)
         print(response, response.url.split('/')[-1])   # print the url slug and the response code
         standings = response.json()['data']['standings']
+        return self._parse_rankings(standings)
+
+    @staticmethod
+    def _parse_rankings(standings: List[dict]) -> List[dict]:
+        """ A helper to extract the regular season rankings from the raw standings data
+
+        Parameters
+        ----------
+        standings: `list` of `dict`
+            The raw standings data
+
+        Returns
+        -------
+        rankings: `list` of `dict`
+            A list of standings for each tournament keyed by the season name
+        ---
+        """
         rankings = []
         for standing in standings:
             slugs = standing['slug'].split('_')   # get the season name to use as key
@@ -501,6 +763,27 @@ class LolEsports:
         # get the standings
         standings = self.standings(matching_ids)
         # display the standings
+        standings_str = self._format_standings(standings)
+        if to_str:
+            return standings_str
+        else:
+            print(standings_str)
+
+    @staticmethod
+    def _format_standings(standings: List[dict]) -> str:
+        """ A helper to format the rankings returned by :meth:`standings` into a string
+
+        Parameters
+        ----------
+        standings: `list` of `dict`
+            A list of standings for each tournament
+
+        Returns
+        -------
+        standings_str: `str`
+            The standings as a string
+        ---
+        """
         standings_str = ""
         for standing in standings:
             for standing_name, rankings in standing.items():
@@ -514,23 +797,18 @@ class LolEsports:
                     losses = team['record']['losses']
                     standings_str += f"\n{ordinal}. {name} ({code}): {wins}-{losses}"
             standings_str += "\n"
-        if to_str:
-            return standings_str
-        else:
-            print(standings_str)
+        return standings_str
     
-    # create a helper function to get the major league ids from the constants file which are the first 4 items in the Region(Enum)
-    @staticmethod
-    def get_major_league_ids() -> list:
-        """ A helper to get the major league ids from the constants file which are the first 4 items in the Region(Enum)
+    @classmethod
+    def get_major_league_ids(cls) -> list:
+        """ A helper to get the major league ids from the league registry
 
         Returns
         -------
         major_league_ids: `list`
             A list of major league ids
         """
-        major_league_ids = [region.value for region in Region][:4]
-        return major_league_ids
+        return cls.league_registry.major_ids()
 
     def get_teams_mapping(self, tournament_ids: Union[int, List[int]], to_sort: bool = False) -> dict:
         """Get the teams mapping from the given tournament id(s) using the standings
@@ -550,6 +828,24 @@ class LolEsports:
         if isinstance(tournament_ids, int):
             tournament_ids = [tournament_ids]
         standings = self.standings(tournament_ids)
+        return self._parse_teams_mapping(standings, to_sort)
+
+    @staticmethod
+    def _parse_teams_mapping(standings: List[dict], to_sort: bool = False) -> dict:
+        """ A helper to extract the code-to-slug mapping of the teams from the rankings
+
+        Parameters
+        ----------
+        standings: `list` of `dict`
+            A list of standings for each tournament
+        to_sort: `bool`
+            Whether to sort the teams mapping alphabetically
+
+        Returns
+        -------
+        teams: `dict`
+            A dictionary of teams with the code as the key and the slug as the value
+        """
         teams = {}
         # Iterate through the list and extract the code-to-slug mapping
         for standing in standings:
@@ -623,10 +919,9 @@ class LolEsports:
         roster: `dict`
             A dictionary of player roster
         """
-        players = team_info['players']
-        for player in players:
-            player.update({'fullname': f'{player["firstName"]} "{player["summonerName"]}" {player["lastName"]}'})
-        return players
+        # the team info is shared by every caller of the cached response, the players are copied before annotating
+        return [{**player, 'fullname': f'{player["firstName"]} "{player["summonerName"]}" {player["lastName"]}'}
+                for player in team_info['players']]
     
     # a function to return events without tbd
     @staticmethod
@@ -748,42 +1043,10 @@ class LolEsports:
         Returns
         -------
         result_strings: `list` of `str`
-            A list of team records
+            A list of team records. Only the decided matches are counted, the unplayed ones are skipped
         '''
-        records = {}
-        total_wins = 0
-        total_losses = 0
-        team_code = team_code.upper()
-        for match in matches:
-            for team in match['teams']:
-                if team['code'] == team_code:
-                    opponent = next(t for t in match['teams'] if t != team)
-                    opponent_name = opponent['code']
-
-                    if opponent_name not in records:
-                        records[opponent_name] = [0, 0]
-
-                    if by_game:
-                        records[opponent_name][0] += team['result']['gameWins']
-                        records[opponent_name][1] += opponent['result']['gameWins']
-                        total_wins  += team['result']['gameWins']
-                        total_losses += opponent['result']['gameWins']
-                    else:
-                        if team['result']['outcome'] == 'win':
-                            records[opponent_name][0] += 1
-                            total_wins += 1
-                        else:
-                            records[opponent_name][1] += 1
-                            total_losses += 1
-
-        # sort the records in descending order by default
-        sorted_records = sorted(records.items(), key=lambda x: x[1][0], reverse=not ascending)
-        result_strings = [f"{team_code} {w}-{l} {opp}" for opp, [w, l] in sorted_records]
-        winrate = total_wins / (total_wins + total_losses) * 100
-        # add the total wins and losses and the winrate to the last 2 items in the list
-        result_strings.append(f"Total: {total_wins}-{total_losses}")
-        result_strings.append(f"Win Rate: {winrate:.1f}%")
-        return result_strings      
+        from utils.analytics import HeadToHead
+        return HeadToHead.from_matches(matches).team_records(team_code, by_game, ascending)
 
     def matches_with_vods(self, tournament_ids:Union[int, List[int]]) -> List[dict]:
         """Get the matches with available vods of a tournament. Only available for the completed matches
@@ -861,3 +1124,1262 @@ class LolEsports:
         print(response, response.url.split('/')[-1])
         recent_matches = response.json()['data']['schedule']['events']
         return recent_matches
+
+
+class HTTPClient:
+    """A shared asyncio transport for the esports api backed by one pooled :class:`aiohttp.ClientSession`
+
+    The session is created lazily on the first request (it must be created inside a running event loop)
+    and is reused by every :class:`AsyncLolEsports` instance so that connections are kept alive and pooled.
+    Identical requests that are in flight at the same time are coalesced into a single upstream request
+    whose decoded body is shared by all the callers, and successful responses are kept in a
+    :class:`utils.cache.ResponseCache` for the time to live of their endpoint. The returned data is
+    therefore shared and must be treated as read-only. Expired responses are revalidated with conditional requests.
+
+    Every request has connect and read timeouts and is retried with jittered exponential backoff on connection
+    errors, timeouts and retryable statuses, honoring ``Retry-After``. Each endpoint has a :class:`CircuitBreaker`
+    that fails fast while upstream is degraded; failed or rejected requests fall back to any cached response
+    of the same key before raising an :class:`APIError`.
+
+    Parameters
+    ----------
+    limit: `int`
+        The total number of simultaneous connections in the pool
+    limit_per_host: `int`
+        The number of simultaneous connections to the esports api host
+    connect_timeout: `float`
+        The timeout in seconds to acquire a connection and connect to the host
+    read_timeout: `float`
+        The timeout in seconds between two reads of the response
+    cache: `ResponseCache`
+        The response cache. Defaults to a cache with the endpoint ttls from :data:`utils.constants.CACHE_TTLS`
+        persisted to the SQLite file given by the ``CACHE_PATH`` environment variable
+    retry_policy: `RetryPolicy`
+        The retry policy of the requests
+    failure_threshold: `int`
+        The number of consecutive failures that opens the circuit breaker of an endpoint
+    reset_timeout: `float`
+        The number of seconds an open circuit breaker waits before letting a trial request through
+    """
+    def __init__(self, limit: int = 100, limit_per_host: int = 30, connect_timeout: float = 5.0, read_timeout: float = 10.0,
+                 cache: Optional[ResponseCache] = None, retry_policy: Optional[RetryPolicy] = None,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        if cache is None:
+            cache = ResponseCache(store=PersistentStore(os.getenv('CACHE_PATH', 'lolesports_cache.sqlite3')))
+        self.cache = cache
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers = {}     # endpoint -> CircuitBreaker
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._inflight = {}    # request key -> the task of the upstream request
+        self.coalesced = 0     # number of requests served by joining an in-flight request
+        self.not_modified = 0  # number of upstream responses that reused the cached body
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it if it does not exist or was closed
+
+        Returns
+        -------
+        session: `aiohttp.ClientSession`
+            The pooled client session
+        ---
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host, ttl_dns_cache=300)
+            timeout = aiohttp.ClientTimeout(total=None, connect=self.connect_timeout, sock_read=self.read_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    @staticmethod
+    def make_key(url: str, params: dict) -> str:
+        """Build the key identifying a request from the url and the normalized query parameters
+
+        The parameters are sorted by name and their values are stringified with any whitespace removed,
+        so that ``{'leagueId': 1, 'hl': 'en-US'}`` and ``{'hl': 'en-US', 'leagueId': '1'}`` share the same key.
+
+        Parameters
+        ----------
+        url: `str`
+            The url of the endpoint
+        params: `dict`
+            The query parameters
+
+        Returns
+        -------
+        key: `str`
+            The request key
+        ---
+        """
+        query = '&'.join(f"{name}={''.join(str(value).split())}" for name, value in sorted(params.items()) if value is not None)
+        return f'{url}?{query}'
+
+    async def get(self, url: str, params: dict, headers: dict, allow_stale: bool = False, parser: Optional[Callable] = None) -> Any:
+        """Send a GET request and return the decoded json body, or the models built from it by ``parser``
+
+        Fresh responses are served from the cache. On a miss, concurrent callers asking for the same request key
+        await the same upstream request, which is shielded so that one caller being cancelled does not cancel it
+        for the others. With ``allow_stale``, an expired response that is within the hard-stale ceiling of its
+        endpoint is returned immediately while a single background request refreshes it. The result of ``parser``
+        is memoized on the cache entry, so the models of a response are only built once.
+
+        Parameters
+        ----------
+        url: `str`
+            The url of the endpoint
+        params: `dict`
+            The query parameters
+        headers: `dict`
+            The request headers
+        allow_stale: `bool`
+            Whether an expired response may be served while it is revalidated in the background
+        parser: `Callable`
+            A function building the models from the decoded json body
+
+        Returns
+        -------
+        data: `dict`
+            The decoded json body, or the result of ``parser``
+        ---
+        """
+        key = self.make_key(url, params)
+        data = self.cache.get(key)
+        if data is None and allow_stale:
+            data = self.cache.get_stale(key, url.rsplit('/', 1)[-1])
+            if data is not None:
+                self._request(key, url, params, headers)   # refresh in the background
+        if data is None:
+            data = await asyncio.shield(self._request(key, url, params, headers))
+        if parser is None:
+            return data
+        return self._parse(key, data, parser)
+
+    def _parse(self, key: str, data: dict, parser: Callable) -> Any:
+        """Build the models of a response once per cache entry"""
+        entry = self.cache.get_entry(key)
+        if entry is None or entry.data is not data:
+            return parser(data)    # the response is not cached
+        if entry.parsed is None:
+            entry.parsed = {}
+        if parser not in entry.parsed:
+            entry.parsed[parser] = parser(data)
+        return entry.parsed[parser]
+
+    def _request(self, key: str, url: str, params: dict, headers: dict) -> asyncio.Future:
+        """Get the in-flight upstream request of a key or start a new one"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, url, params, headers))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._request_done(key, done))
+        else:
+            self.coalesced += 1
+        return task
+
+    def _request_done(self, key: str, task: asyncio.Future) -> None:
+        """Remove a finished request from the in-flight table"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def get_breaker(self, endpoint: str) -> CircuitBreaker:
+        """Get the circuit breaker of an endpoint, creating it on first use"""
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = self.breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    async def _send(self, endpoint: str, url: str, params: dict, headers: dict) -> tuple:
+        """Send the upstream GET request, retrying the failed attempts
+
+        Returns
+        -------
+        response: `tuple`
+            The ``(status, body, etag, last_modified)`` of the response
+
+        Raises
+        ------
+        APIError
+            If every attempt failed or the status is an error that is not worth retrying
+        ---
+        """
+        policy = self.retry_policy
+        session = self.get_session()
+        for attempt in range(policy.max_attempts):
+            retry_after = None
+            try:
+                async with session.get(url, params=params, headers=headers) as response:
+                    print(f'<Response [{response.status}]>', str(response.url).split('/')[-1])   # print the url slug and the response code
+                    status = response.status
+                    body = await response.read()
+                    if status < 400 or status not in policy.retry_statuses:
+                        if status >= 400:
+                            raise APIError(endpoint, status)
+                        return status, body, response.headers.get('ETag'), response.headers.get('Last-Modified')
+                    error = APIError(endpoint, status)
+                    retry_after = policy.parse_retry_after(response.headers.get('Retry-After'))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = APIError(endpoint, message=f'{type(e).__name__} - {e}')
+            if attempt + 1 >= policy.max_attempts or (retry_after is not None and retry_after > policy.max_delay):
+                break
+            delay = policy.backoff(attempt) if retry_after is None else retry_after
+            print(f'**`ERROR:`** {error}, retrying in {delay:.1f}s')
+            await asyncio.sleep(delay)
+        raise error
+
+    async def _fetch(self, key: str, url: str, params: dict, headers: dict) -> dict:
+        """Send the upstream GET request, decode the json body and cache it if the request succeeded
+
+        If an expired response of the same key is still cached, the request is made conditional with its
+        ``ETag``/``Last-Modified`` validators and the cached body is reused on a ``304``. A ``200`` whose body is
+        byte-identical to the cached one is not decoded again either. When upstream fails or the circuit breaker
+        of the endpoint is open, the cached response is served regardless of its age if there is one.
+        """
+        endpoint = url.rsplit('/', 1)[-1]
+        entry = self.cache.get_entry(key)
+        breaker = self.get_breaker(endpoint)
+        if not breaker.allow():
+            if entry is not None:
+                return entry.data
+            raise CircuitOpenError(endpoint, breaker.retry_in())
+        if entry is not None and (entry.etag or entry.last_modified):
+            headers = dict(headers)
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        try:
+            status, body, etag, last_modified = await self._send(endpoint, url, params, headers)
+            data = None if status == 304 or (entry is not None and entry.digest == body_digest(body)) else schemas.decode(endpoint, body)
+        except (APIError, ValueError) as e:
+            # only server side failures count towards opening the breaker
+            if not isinstance(e, APIError) or e.status is None or e.status >= 500 or e.status == 429:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if entry is not None:
+                print(f'**`ERROR:`** {type(e).__name__} - {e}, serving the cached response')
+                return entry.data
+            if isinstance(e, APIError):
+                raise
+            raise APIError(endpoint, status, 'invalid json body') from e
+        finally:
+            # a cancelled half-open trial would otherwise keep the breaker from letting any other request through
+            breaker.end_trial()
+        breaker.record_success()
+        if data is None:
+            if entry is None:
+                raise APIError(endpoint, status, 'no cached response to revalidate')
+            # upstream confirmed that the cached response is unchanged (304) or sent the same bytes, skip decoding
+            self.cache.refresh(key, etag, last_modified)
+            self.not_modified += 1
+            return entry.data
+        if status == 200:
+            self.cache.set(key, endpoint, data, len(body), body=body, etag=etag, last_modified=last_modified)
+        return data
+
+    def load_cache(self) -> int:
+        """Warm the response cache from its persistent store
+
+        Returns
+        -------
+        loaded: `int`
+            The number of responses loaded from disk
+        ---
+        """
+        loaded = self.cache.load()
+        print(f'Loaded {loaded} cached responses from disk.')
+        return loaded
+
+    async def close(self) -> None:
+        """Close the shared session if it is open and the persistent store of the cache"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.cache.store is not None:
+            # waits for the queued writes to be committed
+            await asyncio.to_thread(self.cache.store.close)
+
+
+class AsyncLolEsports(LolEsports):
+    """The asyncio version of :class:`LolEsports` where every api method is a coroutine
+
+    All instances share the same :class:`HTTPClient` so that the bot only ever holds one pooled session,
+    no matter how many instances are created by the cogs.
+
+    Parameters
+    ----------
+    region: `str`
+        The id, slug or name of the league in the :attr:`league_registry`
+    season: `str`
+        The timeframe of the current tournaments
+    stale_while_revalidate: `bool`
+        Whether to answer with an expired cached response while it is refreshed in the background instead of
+        waiting on upstream. Meant for user facing commands; the hard-stale ceilings are in
+        :data:`utils.constants.CACHE_MAX_STALE`
+    """
+    http = HTTPClient()
+    # the number of league/tournament ids sent in one request by the batch methods
+    batch_size = 4
+    # the number of batch requests in flight at once
+    max_concurrency = 8
+    # the teams of every league, seeded with the known major teams until the first refresh from getTeams
+    team_registry = TeamRegistry.from_mapping({**consts.MAJOR_TEAMS, **consts.WORLDS_TEAMS})
+    _team_registry_source: Optional[List[TeamEntry]] = None
+    _team_registry_refresh: Optional[asyncio.Task] = None
+    # the rendered standings and embeds shared by every instance
+    render_cache = RenderCache()
+    # the standings updated with the live results
+    standings_engine = StandingsEngine()
+
+    def __init__(self, region: str = 'WORLDS', season: str = 'summer_2023', stale_while_revalidate: bool = False):
+        super().__init__(region, season)
+        self.stale_while_revalidate = stale_while_revalidate
+        # aiohttp does not accept None header values
+        self.headers = {key: value for key, value in self.headers.items() if value is not None}
+
+    async def _get(self, endpoint: str, payload: dict, parser: Optional[Callable] = None) -> Any:
+        """Fetch the given endpoint with the shared http client
+
+        Parameters
+        ----------
+        endpoint: `str`
+            The name of the endpoint (ex. getLive, getSchedule)
+        payload: `dict`
+            The query parameters
+        parser: `Callable`
+            An optional function building the models from the decoded json body
+
+        Returns
+        -------
+        data: `dict`
+            The decoded json body, or the models built by ``parser``
+        ---
+        """
+        return await self.http.get(f'{self.api_base}/{endpoint}', payload, self.headers,
+                                   allow_stale=self.stale_while_revalidate, parser=parser)
+
+    @staticmethod
+    def _join_ids(ids: Union[str, int, List[int]]) -> str:
+        """Join a single id or a list of ids into the comma separated query parameter"""
+        if isinstance(ids, (int, str)):
+            ids = [ids]
+        elif not isinstance(ids, list):
+            raise ValueError("Invalid parameter type. Expected int or list of int.")
+        return ','.join(str(_id) for _id in ids)
+
+    async def _get_batched(self, endpoint: str, id_param: str, ids: Union[int, List[int]], parser: Optional[Callable] = None,
+                           batch_size: Optional[int] = None) -> list:
+        """Fetch the given endpoint for a large set of ids by splitting them into chunks of :attr:`batch_size`
+        fetched concurrently, at most :attr:`max_concurrency` at a time
+
+        Parameters
+        ----------
+        endpoint: `str`
+            The name of the endpoint (ex. getStandingsV3)
+        id_param: `str`
+            The name of the query parameter holding the ids (ex. tournamentId)
+        ids: `int` or `list` of `int`
+            The ids to fetch; duplicates are only fetched once
+        parser: `Callable`
+            An optional function building the models from the decoded json body of each chunk
+        batch_size: `int`
+            The number of ids per request, 1 for the endpoints taking a single id. Defaults to :attr:`batch_size`
+
+        Returns
+        -------
+        results: `list`
+            The decoded body (or models) of each chunk in the order of the given ids, so that merging
+            them gives the same result on every call
+        ---
+        """
+        if isinstance(ids, (int, str)):
+            ids = [ids]
+        elif not isinstance(ids, list):
+            raise ValueError("Invalid parameter type. Expected int or list of int.")
+        ids = list(dict.fromkeys(str(_id) for _id in ids))
+        batch_size = batch_size or self.batch_size
+        chunks = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(chunk: List[str]) -> Any:
+            async with semaphore:
+                return await self._get(endpoint, {'hl': 'en-US', id_param: ','.join(chunk)}, parser)
+
+        return await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+
+    async def live_events(self) -> List[Event]:
+        """Get the live events as :class:`Event` models
+
+        Returns
+        -------
+        live_events: `list` of `Event`
+            A list of live events
+        ---
+        """
+        return await self._get('getLive', {'hl': 'en-US'}, parse_events)
+
+    async def schedule_events(self, league_ids: Union[str, int, List[int]] = None) -> List[Event]:
+        """Get the schedule of a given league(s) as :class:`Event` models
+
+        Parameters
+        ----------
+        league_ids: `int` | `list` of `int` | `str` | `list` of `str`
+            The league_id(s) to get the schedules from. Defaults to the league of the instance
+
+        Returns
+        -------
+        events: `list` of `Event`
+            A list of the recent and upcoming events
+        ---
+        """
+        return (await self.schedule_index(league_ids)).events
+
+    async def schedule_index(self, league_ids: Union[str, int, List[int]] = None) -> ScheduleIndex:
+        """Get the schedule of a given league(s) indexed by start time
+
+        The index is built once per response and shared by every caller until the schedule changes
+
+        Parameters
+        ----------
+        league_ids: `int` | `list` of `int` | `str` | `list` of `str`
+            The league_id(s) to get the schedules from. Defaults to the league of the instance
+
+        Returns
+        -------
+        index: `ScheduleIndex`
+            The recent and upcoming events by start time
+        ---
+        """
+        payload = {
+            'hl': 'en-US',
+            'leagueId': self._join_ids(self.league_id if league_ids is None else league_ids)
+        }
+        return await self._get('getSchedule', payload, parse_schedule_index)
+
+    async def schedule_page(self, league_ids: Union[str, int, List[int]] = None, page_token: Optional[str] = None) -> SchedulePage:
+        """Get one page of the schedule of a given league(s)
+
+        Parameters
+        ----------
+        league_ids: `int` | `list` of `int` | `str` | `list` of `str`
+            The league_id(s) to get the schedule from. Defaults to the league of the instance
+        page_token: `str`
+            The token of the page, as found in :attr:`SchedulePage.older` or :attr:`SchedulePage.newer`.
+            Defaults to the current page
+
+        Returns
+        -------
+        page: `SchedulePage`
+            The events of the page and the tokens of the older and newer pages
+        ---
+        """
+        payload = {
+            'hl': 'en-US',
+            'leagueId': self._join_ids(self.league_id if league_ids is None else league_ids)
+        }
+        if page_token:
+            payload['pageToken'] = page_token
+        return await self._get('getSchedule', payload, parse_schedule_page)
+
+    async def schedule_pages(self, league_ids: Union[str, int, List[int]] = None, direction: Literal['older', 'newer'] = 'older',
+                             page_token: Optional[str] = None, prefetch: bool = True) -> AsyncIterator[SchedulePage]:
+        """Lazily iterate over the pages of the schedule of a given league(s) in one direction
+
+        Pages are only fetched as the iteration reaches them. With ``prefetch``, the next page is requested
+        as soon as a page is yielded so that it is usually ready by the time the consumer asks for it.
+
+        Parameters
+        ----------
+        league_ids: `int` | `list` of `int` | `str` | `list` of `str`
+            The league_id(s) to get the schedule from. Defaults to the league of the instance
+        direction: `str`
+            Whether to walk to the ``older`` (past) or the ``newer`` (future) pages
+        page_token: `str`
+            The token of the first page to yield. Defaults to the current page
+        prefetch: `bool`
+            Whether to fetch one page ahead of the consumer
+
+        Yields
+        ------
+        page: `SchedulePage`
+            The pages of the schedule, starting from ``page_token``
+        ---
+        """
+        if direction not in ('older', 'newer'):
+            raise ValueError("Invalid direction. Expected 'older' or 'newer'.")
+        task = asyncio.ensure_future(self.schedule_page(league_ids, page_token))
+        try:
+            while task is not None:
+                page = await task
+                token = page.older if direction == 'older' else page.newer
+                task = asyncio.ensure_future(self.schedule_page(league_ids, token)) if token and prefetch else None
+                yield page
+                if token and task is None:
+                    task = asyncio.ensure_future(self.schedule_page(league_ids, token))
+        finally:
+            # the consumer stopped early, drop the look-ahead request
+            if task is not None and not task.done():
+                task.cancel()
+
+    async def upcoming_events(self, team_slug: Optional[str] = None, league_ids: Union[int, List[int]] = None) -> Optional[List[Event]]:
+        """Get the upcoming events of a team or a league as :class:`Event` models
+
+        Parameters
+        ----------
+        team_slug: `str`[optional]
+            The team slug to get the event list from.
+        league_ids: `int` or `list` of `int`
+            The league_id(s) to get the event list from.
+
+        Returns
+        -------
+        events: `list` of `Event`
+            A list of events, None if there are no events
+        """
+        return (await self.upcoming_index(team_slug, league_ids)).events or None
+
+    async def upcoming_index(self, team_slug: Optional[str] = None, league_ids: Union[int, List[int]] = None) -> ScheduleIndex:
+        """Get the upcoming events of a team or a league indexed by start time
+
+        Parameters
+        ----------
+        team_slug: `str`[optional]
+            The team slug to get the event list from.
+        league_ids: `int` or `list` of `int`
+            The league_id(s) to get the event list from.
+
+        Returns
+        -------
+        index: `ScheduleIndex`
+            The events by start time, empty if there are no events
+        ---
+        """
+        if team_slug:
+            payload = {'hl': 'en-US', 'teamId': team_slug}
+        elif league_ids is not None:
+            payload = {'hl': 'en-US', 'leagueId': self._join_ids(league_ids)}
+        else:
+            raise ValueError("Either team_slug or league_ids must be provided")
+        return await self._get('getEventList', payload, parse_event_list_index)
+
+    async def league_list(self) -> List[League]:
+        """Get the esports leagues as :class:`League` models in the upstream order
+
+        Returns
+        -------
+        leagues: `list` of `League`
+            A list of esports leagues
+        ---
+        """
+        return await self._get('getLeagues', {'hl': 'en-US'}, parse_leagues)
+
+    async def tournament_list(self, league_ids: Union[int, List[int]]) -> List[Tournament]:
+        """Get the tournaments of a given league(s) as :class:`Tournament` models
+
+        Parameters
+        ----------
+        league_ids: `int` or `list` of `int`
+            The league_id(s) to get the tournaments from
+
+        Returns
+        -------
+        tournaments: `list` of `Tournament`
+            A list of tournaments
+        ---
+        """
+        results = await self._get_batched('getTournamentsForLeague', 'leagueId', league_ids, parse_tournaments)
+        return [tournament for tournaments in results for tournament in tournaments]
+
+    async def standing_rows(self, tournament_ids: Union[int, List[int]]) -> dict:
+        """Get the regular season standings of a tournament(s) as :class:`StandingRow` models
+
+        Parameters
+        ----------
+        tournament_ids: `int` or `list` of `int`
+            The tournament_id(s) to get the standings from.
+
+        Returns
+        -------
+        standings: `dict`
+            A dictionary of the season name to the `list` of `StandingRow` of the season
+        ---
+        """
+        return {standing.season: standing.rows for standing in await self.standing_tables(tournament_ids)}
+
+    async def standing_tables(self, tournament_ids: Union[int, List[int]]) -> List[Standing]:
+        """Get the regular season standings of a tournament(s) as versioned :class:`Standing` models
+
+        Parameters
+        ----------
+        tournament_ids: `int` or `list` of `int`
+            The tournament_id(s) to get the standings from.
+
+        Returns
+        -------
+        standings: `list` of `Standing`
+            The standings of each season
+        ---
+        """
+        results = await self._get_batched('getStandingsV3', 'tournamentId', tournament_ids, parse_standings)
+        return [standing for standings in results for standing in standings]
+
+    async def match_list(self, tournament_id: int) -> List[Match]:
+        """Get the regular season matches of a tournament as :class:`Match` models
+
+        Parameters
+        ----------
+        tournament_id: `int`
+            The tournament_id to get the matches from
+
+        Returns
+        -------
+        matches: `list` of `Match`
+            A list of matches
+        ---
+        """
+        return await self._get('getStandings', {'hl': 'en-US', 'tournamentId': str(tournament_id)}, parse_matches)
+
+    async def head_to_head(self, tournament_id: int) -> 'HeadToHead':
+        """Get the team by team head-to-head results of the regular season of a tournament
+
+        The matrices are built once per getStandings response, so the record, win rate or opponents of any team
+        is a lookup until the matches change.
+
+        Parameters
+        ----------
+        tournament_id: `int`
+            The tournament_id to get the matches from
+
+        Returns
+        -------
+        head_to_head: `HeadToHead`
+            The series and game wins of every team against every other team
+        ---
+        """
+        return await self._get('getStandings', {'hl': 'en-US', 'tournamentId': str(tournament_id)}, parse_head_to_head)
+
+    async def live_standings(self, tournament_ids: Union[int, List[int]]) -> List[Standing]:
+        """Get the regular season standings of a tournament(s) including the results seen live that upstream did not count yet
+
+        The tournaments are seeded in the :attr:`standings_engine` on first use and reconciled with upstream every
+        :attr:`utils.standings.StandingsEngine.reconcile_interval` seconds; any other call costs no request.
+
+        Parameters
+        ----------
+        tournament_ids: `int` or `list` of `int`
+            The tournament_id(s) to get the standings from.
+
+        Returns
+        -------
+        standings: `list` of `Standing`
+            The standings of each tournament
+        ---
+        """
+        if isinstance(tournament_ids, (int, str)):
+            tournament_ids = [tournament_ids]
+        tournament_ids = list(dict.fromkeys(int(_id) for _id in tournament_ids))
+        engine = self.standings_engine
+        due = [_id for _id in tournament_ids if engine.needs_seed(_id)]
+        fallback = await self._seed_standings(due) if due else {}
+        standings = (engine.standing(_id) or fallback.get(_id) for _id in tournament_ids)
+        return [standing for standing in standings if standing is not None]
+
+    async def _seed_standings(self, tournament_ids: List[int]) -> dict:
+        """Seed or reconcile tournaments of the :attr:`standings_engine` from upstream, their requests batched
+
+        A tournament already seeded keeps its table until the next reconciliation when a request fails. A tournament
+        never seeded whose matches failed to load gets its upstream standings instead of a live table.
+
+        Parameters
+        ----------
+        tournament_ids: `list` of `int`
+            The tournaments to seed
+
+        Returns
+        -------
+        fallback: `dict`
+            The upstream :class:`Standing` of the tournaments that could not be seeded, by tournament id
+        ---
+        """
+        engine = self.standings_engine
+        standings, matches = await asyncio.gather(
+            self.standing_tables(tournament_ids),
+            # getStandings only holds the matches of its first tournament, one tournament per request
+            self._get_batched('getStandings', 'tournamentId', tournament_ids, parse_matches, batch_size=1),
+            return_exceptions=True)
+        for result in (standings, matches):
+            if isinstance(result, BaseException) and not isinstance(result, (APIError, ValueError, KeyError, IndexError)):
+                raise result
+        if not isinstance(standings, BaseException) and len(standings) != len(tournament_ids):
+            standings = ValueError(f'Expected the standings of {len(tournament_ids)} tournaments, got {len(standings)}')
+        error = standings if isinstance(standings, BaseException) else matches if isinstance(matches, BaseException) else None
+        if error is None:
+            for tournament_id, standing, tournament_matches in zip(tournament_ids, standings, matches):
+                engine.seed(tournament_id, standing, tournament_matches)
+            return {}
+        fallback = {}
+        for index, tournament_id in enumerate(tournament_ids):
+            if engine.standing(tournament_id) is not None:
+                # keep the current table until the next reconciliation
+                engine.tables[tournament_id].seeded_at = time.monotonic()
+            elif error is matches:
+                fallback[tournament_id] = standings[index]
+            else:
+                raise error
+        print(f'**`ERROR:`** {type(error).__name__} - {error}')
+        return fallback
+
+    async def track_live_results(self, events: List[Event]) -> int:
+        """Count the finished series of the live events in the :attr:`standings_engine`
+
+        Meant to be called by the live poller with every :meth:`live_events` result. The series that ended between
+        two polls are no longer live, so their final result is fetched from getEventDetails.
+
+        Parameters
+        ----------
+        events: `list` of `Event`
+            The events live right now
+
+        Returns
+        -------
+        applied: `int`
+            The number of results that changed the standings
+        ---
+        """
+        engine = self.standings_engine
+        matches = [event.match for event in events if event.match is not None]
+        applied = sum(engine.observe(match) for match in matches)
+        ended = engine.track_live(match.id for match in matches)
+        if ended:
+            # getEventDetails takes a single id, the ended series are fetched concurrently
+            for match in await self._get_batched('getEventDetails', 'id', ended, parse_event_details_match, batch_size=1):
+                if match is not None:
+                    applied += engine.observe(match)
+        return applied
+
+    async def current_tournament_ids(self, league_ids: Union[int, List[int]], today: Optional[str] = None) -> List[int]:
+        """Get the ids of the tournaments of a given league(s) running today
+
+        Parameters
+        ----------
+        league_ids: `int` or `list` of `int`
+            The league_id(s) to get the tournaments from
+        today: `str`
+            The date to compare with the tournament dates (ex. 2023-10-10). Defaults to the current utc date
+
+        Returns
+        -------
+        tournament_ids: `list` of `int`
+            The ids of the tournaments whose dates include today
+        ---
+        """
+        today = today or datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        return [tournament.id for tournament in await self.tournament_list(league_ids)
+                if (tournament.start_date or '') <= today <= (tournament.end_date or '')]
+
+    async def seed_live_standings(self, league_ids: Union[int, List[int]]) -> List[Standing]:
+        """Seed (or reconcile when due) the :attr:`standings_engine` with the running tournaments of a given league(s)
+
+        Meant to be called by the live poller before :meth:`track_live_results` so that the live results are counted
+        without waiting for someone to ask for the standings.
+        """
+        return await self.live_standings(await self.current_tournament_ids(league_ids))
+
+    def render_standing(self, standing: Standing) -> str:
+        """Get the text of a season standings, only formatted again when the standings changed
+
+        Parameters
+        ----------
+        standing: `Standing`
+            The standings of a season
+
+        Returns
+        -------
+        standing_str: `str`
+            The standings as a string
+        ---
+        """
+        return self.render_cache.get_or_render(('standing', standing.season), standing.version,
+                                               lambda: self._format_standing_rows({standing.season: standing.rows}))
+
+    async def get_current_teams(self) -> dict:
+        """Get the teams from the current league
+
+        Returns
+        -------
+        teams: `dict`
+            A dictionary of teams with the code as the key and the slug as the value
+        ---
+        """
+        if self.teams is None:
+            current_tournament_id = await self.get_current_tournament_id()
+            self.teams = await self.get_teams_mapping(current_tournament_id)
+        return self.teams
+
+    async def get_current_tournament_id(self) -> int:
+        """Get the current tournament id
+
+        Returns
+        -------
+        tournament_id: `int`
+            The current tournament id
+        ---
+        """
+        if self.tournament_id is None:
+            tournament_ids = await self.get_tournament_ids(self.league_id, self.timeframe)
+            self.tournament_id = tournament_ids[-1]
+        return self.tournament_id
+
+    async def get_current_standings(self) -> List[dict]:
+        """Get the current standings
+
+        Returns
+        -------
+        rankings: `list` of `dict`
+            A list of standings for each tournament
+        ---
+        """
+        current_tournament_id = await self.get_current_tournament_id()
+        return await self.standings(current_tournament_id)
+
+    async def live(self) -> List[dict]:
+        """Get the live events
+
+        Returns
+        -------
+        live_events: `list` of `dict`
+            A list of live events
+        ---
+        """
+        data = await self._get('getLive', {'hl': 'en-US'})
+        return data['data']['schedule']['events']
+
+    async def live_result(self) -> str:
+        '''Fetch the live events
+
+        Returns
+        -------
+        result: `str`
+            The live events
+        ---
+        '''
+        result = ''
+        live_events = await self.live()
+        if len(live_events) == 0:
+            result = "No live event!"
+        else:
+            for live_event in live_events:
+                result += "event id: {}\n".format(live_event['id'])
+                if live_event['type'] == 'show':
+                    result += '{} pre-{} is starting'.format(live_event['league']['name'], live_event['type'])
+                else: # type match
+                    result += '{} {}\n'.format(live_event['league']['name'], live_event['blockName'])
+                    for team in live_event['match']['teams']:
+                        result += '%s ' % team['name']
+                    result+='\n'
+        return result
+
+    async def schedules(self, league_ids: Union[str, int, List[int]] = None) -> List[dict]:
+        """Fetch the schedules of a given league(s)
+
+        Parameters
+        ----------
+        league_ids: `int` | `list` of `int` | `str` | `list` of `str`
+            The league_id(s) to get the schedules from.
+
+        Returns
+        -------
+        schedules: `list` of `dict`
+            A list of schedule of the recent events (80 events in total)
+        ---
+        """
+        if league_ids is None:
+            league_ids = [self.league_id]
+        elif isinstance(league_ids, (int, str)):
+            league_ids = [league_ids]
+        elif not isinstance(league_ids, list):
+            raise ValueError("Invalid parameter type. Expected int or list of int.")
+        payload = {
+            'hl': 'en-US',
+            'leagueId': ','.join(str(_id) for _id in league_ids)
+        }
+        data = await self._get('getSchedule', payload)
+        return data['data']['schedule']['events']
+
+    async def leagues(self, is_sorted: bool = False) -> list:
+        """Fetch the esports leagues
+
+        Parameters
+        ----------
+        is_sorted: `bool`
+            Whether to sort the leagues by priority
+
+        Returns
+        -------
+        leagues: `list`
+            A list of esports leagues
+        ---
+        """
+        try:
+            registry = await self.load_league_registry()
+        except Exception as e:
+            print(f'**`ERROR:`** {type(e).__name__} - {e}')
+            return None
+        return list(registry.leagues if is_sorted else registry.raw)
+
+    async def load_league_registry(self) -> LeagueRegistry:
+        """Get the shared :attr:`league_registry` built from the cached getLeagues response
+
+        The registry is only rebuilt when the getLeagues response changed, so this is a cache lookup on every
+        call but the first one.
+
+        Returns
+        -------
+        registry: `LeagueRegistry`
+            The leagues by id, slug and name with their groupings
+        ---
+        """
+        registry = await self._get('getLeagues', {'hl': 'en-US'}, parse_league_registry)
+        LolEsports.league_registry = registry
+        return registry
+
+    async def get_image_url(self, league_name: str) -> str:
+        """Get the image url of a given league
+
+        Parameters
+        ----------
+        league_name: `str`
+            The name of the league to get the image url from
+
+        Returns
+        -------
+        image_url: `str`
+            The image url of the league
+        ---
+        """
+        registry = await self.load_league_registry()
+        return registry.image_url(league_name)
+
+    async def tournaments(self, league_ids: Union[int, List[int]], timeframe: Optional[str] = None) -> dict:
+        """Fetch the tournaments of a given league(s)
+
+        Parameters
+        ----------
+        league_ids: `int` or `list` of `int`
+            The league_id(s) to get the tournaments from
+
+        timeframe[optional]: `str` [default: None]
+            The timeframe to extract the tournaments from. If not provided, return the raw tournament data
+
+        Returns
+        -------
+        tournaments_data: `dict`
+            A dictionary of tournaments
+        ---
+        """
+        results = await self._get_batched('getTournamentsForLeague', 'leagueId', league_ids)
+        tournaments_data = [league for data in results for league in data['data']['leagues']]
+        if timeframe:
+            tournaments_data = self._extract_tournaments_by_timeframe(tournaments_data, timeframe)
+        return tournaments_data
+
+    async def get_tournament_ids(self, league_ids: Union[int, List[int]], timeframe: str = None) -> list:
+        """Get the tournament ids of a given league(s)
+
+        Parameters
+        ----------
+        league_ids: `int` or `list` of `int`
+            The league_id(s) to get the tournaments from.
+        timeframe: `str`
+            The timeframe to extract the tournaments from
+
+        Returns
+        -------
+        tournament_ids: `list`
+            A list of tournament ids
+        ---
+        """
+        tournaments = await self.tournaments(league_ids, timeframe)
+        return self.extract_tournament_ids(tournaments)
+
+    async def standings(self, tournament_id: Union[int, List[int]]) -> List[dict]:
+        """Fetch the standings of a tournament
+
+        Parameters
+        ----------
+        tournament_id: `int` or `list` of `int`
+            The tournament_id(s) to get the standings from.
+
+        Returns
+        -------
+        rankings: `list` of `dict`
+            A list of standings for each tournament
+        ---
+        """
+        results = await self._get_batched('getStandingsV3', 'tournamentId', tournament_id)
+        return [ranking for data in results for ranking in self._parse_rankings(data['data']['standings'])]
+
+    async def display_standings(self, league_ids: Union[int, List[int]], timeframe: str, to_str: bool = False) -> Optional[str]:
+        """Display the standings of a tournament
+
+        Parameters
+        ----------
+        league_ids: `int` or `list` of `int`
+            The league_id(s) to get the tournaments from.
+        timeframe: `str`
+            The timeframe to extract the tournaments from
+        to_str: `bool`
+            Whether to return the standings as a string or print it
+
+        Returns
+        -------
+        standings_str: `str`
+            The standings as a string
+        ---
+        """
+        tournaments = await self.tournaments(league_ids)
+        matching_tournaments = self._extract_tournaments_by_timeframe(tournaments, timeframe)
+        matching_ids = self.extract_tournament_ids(matching_tournaments)
+        standings = await self.live_standings(matching_ids)
+        standings_str = ''.join(self.render_standing(standing) for standing in standings)
+        if to_str:
+            return standings_str
+        else:
+            print(standings_str)
+
+    @staticmethod
+    def _format_standing_rows(standings: dict) -> str:
+        """ A helper to format the rows returned by :meth:`standing_rows` into a string
+
+        Parameters
+        ----------
+        standings: `dict`
+            A dictionary of the season name to its `list` of `StandingRow`
+
+        Returns
+        -------
+        standings_str: `str`
+            The standings as a string
+        ---
+        """
+        parts = []
+        for standing_name, rows in standings.items():
+            parts.append(f"\n{standing_name}:")
+            parts.extend(f"\n{row.ordinal}. {row.team.name} ({row.team.code}): {row.wins}-{row.losses}" for row in rows)
+            parts.append("\n")
+        return ''.join(parts)
+
+    async def get_teams_mapping(self, tournament_ids: Union[int, List[int]], to_sort: bool = False) -> dict:
+        """Get the teams mapping from the given tournament id(s) using the standings
+
+        Parameters
+        ----------
+        tournament_ids: `int` or `list` of `int`
+            The tournament_id(s) to get the teams mapping from.
+        to_sort: `bool`
+            Whether to sort the teams mapping alphabetically
+
+        Returns
+        -------
+        teams: `dict`
+            A dictionary of teams with the code as the key and the slug as the value sorted alphabetically if to_sort is True
+        """
+        if isinstance(tournament_ids, int):
+            tournament_ids = [tournament_ids]
+        standings = await self.standings(tournament_ids)
+        return self._parse_teams_mapping(standings, to_sort)
+
+    async def get_teams_mapping_from_leagues(self, league_ids: Union[int, List[int]], to_sort: bool = False) -> dict:
+        """Get the teams mapping from the given league(s)
+
+        Parameters
+        ----------
+        league_ids: `int` or `list` of `int`
+            The league_id(s) to get the teams mapping from.
+        to_sort: `bool`
+            Whether to sort the teams mapping alphabetically
+
+        Returns
+        -------
+        teams: `dict`
+            A dictionary of teams with the code as the key and the slug as the value sorted alphabetically if to_sort is True
+        """
+        if isinstance(league_ids, int):
+            league_ids = [league_ids]
+        tournament_ids = await self.get_tournament_ids(league_ids, self.timeframe)
+        return await self.get_teams_mapping(tournament_ids, to_sort)
+
+    async def team(self, team_slug: str) -> dict:
+        """Get the detail info of a team
+
+        Parameters
+        ----------
+        team_slug: `str`
+            The team slug to get the info from
+
+        Returns
+        -------
+        team_info: `dict`
+            A dictionary of team info
+        """
+        data = await self._get('getTeams', {'hl': 'en-US', 'id': team_slug})
+        return data['data']['teams'][0]
+
+    async def refresh_team_registry(self) -> TeamRegistry:
+        """Refresh the shared :attr:`team_registry` with the teams of every league
+
+        The trie is only rebuilt when the getTeams response changed since the last refresh.
+
+        Returns
+        -------
+        registry: `TeamRegistry`
+            The refreshed registry
+        ---
+        """
+        cls = AsyncLolEsports
+        entries = await self._get('getTeams', {'hl': 'en-US'}, parse_team_entries)
+        if entries is not cls._team_registry_source:
+            cls.team_registry.update(entries)
+            cls._team_registry_source = entries
+        return cls.team_registry
+
+    def refresh_team_registry_soon(self) -> None:
+        """Refresh the :attr:`team_registry` in the background if it was never refreshed or is older than the getTeams ttl"""
+        cls = AsyncLolEsports
+        if cls._team_registry_refresh is not None and not cls._team_registry_refresh.done():
+            return
+        registry = cls.team_registry
+        if cls._team_registry_source is not None and time.monotonic() - registry.updated_at < consts.CACHE_TTLS['getTeams']:
+            return
+        cls._team_registry_refresh = asyncio.ensure_future(self.refresh_team_registry())
+        cls._team_registry_refresh.add_done_callback(self._team_registry_refreshed)
+
+    @staticmethod
+    def _team_registry_refreshed(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            e = task.exception()
+            print(f'**`ERROR:`** {type(e).__name__} - {e}')
+
+    async def eventlists(self, team_slug:Optional[str] = None, league_ids:Union[int, List[int]] = None) -> List[dict]:
+        """Get the event list of a team or a league
+
+        Parameters
+        ----------
+        team_slug: `str`[optional]
+            The team slug to get the event list from.
+
+        league_ids: `int` or `list` of `int`
+            The league_id(s) to get the event list from.
+
+        Returns
+        -------
+        events: `list` of `dict`
+            A list of events
+        """
+        if team_slug:
+            payload = {
+                'hl': 'en-US',
+                'teamId': team_slug
+            }
+        elif league_ids is not None:
+            if isinstance(league_ids, int):
+                league_ids = [league_ids]
+            elif not isinstance(league_ids, list):
+                raise ValueError("Invalid parameter type. Expected int or list of int.")
+            payload = {
+                'hl': 'en-US',
+                'leagueId': ','.join(map(str, league_ids))
+            }
+        else:
+            raise ValueError("Either team_slug or league_ids must be provided")
+        events = await self._get('getEventList', payload)
+        if not events['data']['esports']:
+            return None
+        else:
+            return events['data']['esports']['events']
+
+    async def matches(self, tournament_id: Union[int, List[int]]) -> List[dict]:
+        """Get the matches of a tournament
+
+        Parameters
+        ----------
+        tournament_id: `int` or `list` of `int`
+            The tournament_id(s) to get the matches from.
+
+        Returns
+        -------
+        matches_list: `list` of `dict`
+            A list of matches
+        """
+        if isinstance(tournament_id, int):
+            tournament_id = [tournament_id]
+        elif not isinstance(tournament_id, list):
+            raise ValueError("Invalid parameter type. Expected int or list of int.")
+        payload = {
+            'hl': 'en-US',
+            'tournamentId' : ','.join(map(str, tournament_id)),
+        }
+        data = await self._get('getStandings', payload)
+        return data['data']['standings'][0]['stages'][0]['sections'][0]['matches']
+
+    async def matches_with_vods(self, tournament_ids:Union[int, List[int]]) -> List[dict]:
+        """Get the matches with available vods of a tournament. Only available for the completed matches
+
+        Parameters
+        ----------
+        tournament_id: `int`
+            The tournament id to get the matches from
+
+        Returns
+        -------
+        matches: `list` of `dict`
+            A list of matches with the vods
+        """
+        if isinstance(tournament_ids, int):
+            tournament_ids = [tournament_ids]
+        elif not isinstance(tournament_ids, list):
+            raise ValueError("Invalid parameter type. Expected int or list of int.")
+        payload = {
+            'hl': 'en-US',
+            'tournamentId': ','.join(map(str, tournament_ids)),
+        }
+        data = await self._get('getVods', payload)
+        return data['data']['schedule']['events']
+
+    async def match_details(self, match_id: int) -> dict:
+        """Get the match details of a match
+
+        Parameters
+        ----------
+        match_id: `int`
+            The match id to get the details from
+
+        Returns
+        -------
+        match_details: `dict`
+            A dictionary of match details
+        """
+        return await self._get('getEventDetails', {'hl': 'en-US', 'id': match_id})
+
+    async def recent_matches(self, league_id: int) -> List[dict]:
+        """Get the recent 20 matches of a league
+
+        Parameters
+        ----------
+        league_id: `int`
+            The league id to get the matches from
+
+        Returns
+        -------
+        recent_matches: `list` of `dict`
+            A list of recent matches
+        """
+        data = await self._get('getVodsForHome', {'hl': 'en-US', 'leagueId': league_id})
+        return data['data']['schedule']['events']
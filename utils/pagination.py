@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+import discord
+
+
+class LazyPaginator(discord.ui.View):
+    """A button paginator rendering its embeds on demand
+
+    Only the visited page and a small window of pages around it are rendered and kept, so opening a menu costs one
+    embed whatever the number of pages, and an open menu holds at most ``2 * ahead + 1`` embeds. The pages wrap
+    around like the reactionmenu ``ViewMenu`` and a page director (ex. ``Page 1/20``) is prepended to the footer.
+
+    With ``load_more``, moving past the last page first loads the next pages (ex. the next page of a schedule);
+    the pages only wrap around once it has nothing more to load.
+
+    Parameters
+    ----------
+    count: `int`
+        The number of pages
+    render: `Callable`
+        A function building the embed of a page from its index
+    author_id: `int`
+        The id of the only user allowed to use the buttons, anyone if None
+    ahead: `int`
+        The number of pages rendered ahead on each side of the visited page
+    timeout: `float`
+        The number of seconds of inactivity after which the buttons are disabled
+    load_more: `Callable`
+        A coroutine function loading more pages, returns the new number of pages (the same one once exhausted)
+    """
+    def __init__(self, count: int, render: Callable[[int], discord.Embed], author_id: Optional[int] = None,
+                 ahead: int = 2, timeout: Optional[float] = 60.0, load_more: Optional[Callable[[], Awaitable[int]]] = None):
+        super().__init__(timeout=timeout)
+        self.count = count
+        self.render = render
+        self.author_id = author_id
+        self.ahead = ahead
+        self.load_more = load_more
+        self.page = 0
+        self.message: Optional[discord.Message] = None
+        self._rendered: OrderedDict = OrderedDict()
+
+    def get_page(self, index: int) -> discord.Embed:
+        """Get the embed of a page, rendering it if it is not in the window"""
+        index %= self.count
+        embed = self._rendered.get(index)
+        if embed is None:
+            embed = self.render(index)
+            footer = embed.footer.text
+            embed.set_footer(text=f'Page {index + 1}/{self.count}' + (f': {footer}' if footer else ''), icon_url=embed.footer.icon_url)
+            self._rendered[index] = embed
+        return embed
+
+    def _render_ahead(self) -> None:
+        """Render the pages around the visited one and drop the pages outside of the window"""
+        window = {(self.page + offset) % self.count for offset in range(-self.ahead, self.ahead + 1)}
+        for index in list(self._rendered):
+            if index not in window:
+                del self._rendered[index]
+        for offset in range(1, self.ahead + 1):
+            self.get_page(self.page + offset)
+            self.get_page(self.page - offset)
+
+    async def start(self, interaction: discord.Interaction, page: int = 0) -> None:
+        """Send the menu as the followup of a deferred interaction, rendering the other pages once it is sent"""
+        self.page = page % self.count
+        self.message = await interaction.followup.send(embed=self.get_page(self.page), view=self, wait=True)
+        self._render_ahead()
+
+    async def go_to(self, interaction: discord.Interaction, page: int) -> None:
+        if page >= self.count and self.load_more is not None:
+            # loading the next pages is a request, acknowledge the click before it
+            await interaction.response.defer()
+            count = await self.load_more()
+            if count > self.count:
+                # the page directors of the rendered pages show the previous count
+                self.count = count
+                self._rendered.clear()
+            else:
+                self.load_more = None
+            self.page = page % self.count
+            await interaction.edit_original_response(embed=self.get_page(self.page), view=self)
+        else:
+            self.page = page % self.count
+            await interaction.response.edit_message(embed=self.get_page(self.page), view=self)
+        self._render_ahead()
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return self.author_id is None or interaction.user.id == self.author_id
+
+    async def on_timeout(self) -> None:
+        for item in self.children:
+            item.disabled = True
+        self._rendered.clear()
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+    @discord.ui.button(label='First Page', style=discord.ButtonStyle.gray)
+    async def first_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.go_to(interaction, 0)
+
+    @discord.ui.button(label='Back', style=discord.ButtonStyle.primary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.go_to(interaction, self.page - 1)
+
+    @discord.ui.button(label='Next', style=discord.ButtonStyle.green)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.go_to(interaction, self.page + 1)
+
+    @discord.ui.button(label='Last Page', style=discord.ButtonStyle.gray)
+    async def last_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.go_to(interaction, self.count - 1)
@@ -0,0 +1,86 @@
+import time
+from typing import Optional
+
+
+class PollScheduler:
+    """Decides how long the live poller waits before its next poll, from what is live and what is scheduled
+
+    The poller is in one of three states:
+
+    - ``live``: an event is live, it polls every ``live_interval`` seconds to follow the results
+    - ``starting``: the next match starts within ``lead`` seconds or is late by less than ``late_window`` seconds;
+      it polls every ``fast_interval`` seconds so that a match going live is seen within seconds
+    - ``idle``: nothing is live or about to start; the interval doubles from ``idle_min`` up to ``idle_max`` at
+      every poll, but the poller always wakes up ``lead`` seconds before the next start time
+
+    Only the ``idle`` state backs off, the intervals around a start time and during a match stay a few seconds.
+
+    Parameters
+    ----------
+    fast_interval: `float`
+        The number of seconds between the polls around a start time
+    live_interval: `float`
+        The number of seconds between the polls while an event is live
+    idle_min: `float`
+        The first interval once idle
+    idle_max: `float`
+        The largest interval once idle, it bounds how late an unscheduled live event is seen
+    lead: `float`
+        The number of seconds before a start time the fast polls begin
+    late_window: `float`
+        The number of seconds past its start time an unstarted match is still waited for
+    backoff: `float`
+        The factor the idle interval grows by at every poll
+    """
+    def __init__(self, fast_interval: float = 5.0, live_interval: float = 10.0, idle_min: float = 60.0,
+                 idle_max: float = 30 * 60.0, lead: float = 5 * 60.0, late_window: float = 2 * 60 * 60.0, backoff: float = 2.0):
+        self.fast_interval = fast_interval
+        self.live_interval = live_interval
+        self.idle_min = idle_min
+        self.idle_max = idle_max
+        self.lead = lead
+        self.late_window = late_window
+        self.backoff = backoff
+        self.state = 'idle'
+        # the number of polls in a row in the current state
+        self.streak = 0
+
+    def next_delay(self, live: bool, next_start: Optional[float], now: Optional[float] = None) -> float:
+        """Get the number of seconds to wait before the next poll
+
+        Parameters
+        ----------
+        live: `bool`
+            Whether an event is live right now
+        next_start: `float`
+            The unix time of the next unstarted match, None if nothing is scheduled
+        now: `float`
+            The current unix time. Defaults to the current time
+
+        Returns
+        -------
+        delay: `float`
+            The number of seconds to wait, at least ``fast_interval``
+        ---
+        """
+        now = time.time() if now is None else now
+        if next_start is not None and now > next_start + self.late_window:
+            next_start = None   # the match will not start anymore, it was probably rescheduled
+        if live:
+            state = 'live'
+        elif next_start is not None and now >= next_start - self.lead:
+            state = 'starting'
+        else:
+            state = 'idle'
+        self.streak = self.streak + 1 if state == self.state else 0
+        self.state = state
+
+        if state == 'live':
+            delay = self.live_interval
+        elif state == 'starting':
+            delay = self.fast_interval
+        else:
+            delay = min(self.idle_min * self.backoff ** min(self.streak, 32), self.idle_max)
+            if next_start is not None:
+                delay = min(delay, next_start - self.lead - now)
+        return max(delay, self.fast_interval)
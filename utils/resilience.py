@@ -0,0 +1,148 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+class APIError(Exception):
+    """Raised when the esports api answers with an error status or cannot be reached
+
+    Parameters
+    ----------
+    endpoint: `str`
+        The name of the endpoint
+    status: `int`
+        The http status of the response, or None if no response was received
+    message: `str`
+        The description of the error
+    """
+    def __init__(self, endpoint: str, status: Optional[int] = None, message: str = ''):
+        self.endpoint = endpoint
+        self.status = status
+        super().__init__(f'{endpoint} failed' + (f' with status {status}' if status is not None else '') + (f': {message}' if message else ''))
+
+
+class CircuitOpenError(APIError):
+    """Raised when a request is rejected because the circuit breaker of its endpoint is open"""
+    def __init__(self, endpoint: str, retry_in: float):
+        self.retry_in = retry_in
+        super().__init__(endpoint, message=f'circuit open, retrying upstream in {retry_in:.0f}s')
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for idempotent requests
+
+    Parameters
+    ----------
+    max_attempts: `int`
+        The total number of attempts including the first one
+    base_delay: `float`
+        The backoff ceiling in seconds of the first retry, doubled on every further retry
+    max_delay: `float`
+        The largest delay in seconds to wait between two attempts. A ``Retry-After`` longer than this
+        stops the retries instead of holding the request open
+    retry_statuses: `tuple`
+        The http statuses that are worth retrying
+    """
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 retry_statuses: tuple = (429, 500, 502, 503, 504)):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+
+    def backoff(self, attempt: int) -> float:
+        """Get the full-jitter delay before the retry following the given attempt (starting from 0)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a ``Retry-After`` header given either in seconds or as an http date
+
+        Returns
+        -------
+        delay: `float`
+            The number of seconds to wait, or None if the header is missing or invalid
+        ---
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """A circuit breaker guarding one endpoint
+
+    The breaker opens after ``failure_threshold`` consecutive failed requests and rejects every request for
+    ``reset_timeout`` seconds. It then lets a single trial request through (half-open): a success closes it again
+    and a failure opens it for another ``reset_timeout``.
+
+    Parameters
+    ----------
+    failure_threshold: `int`
+        The number of consecutive failures that opens the breaker
+    reset_timeout: `float`
+        The number of seconds the breaker stays open before a trial request is allowed
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def retry_in(self) -> float:
+        """Get the number of seconds until a trial request is allowed"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        """Whether a request may be sent upstream now"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request"""
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def end_trial(self) -> None:
+        """Let another trial request through if the current one ended without a result (ex. it was cancelled)"""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed request and open the breaker if the threshold is reached or the trial request failed"""
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
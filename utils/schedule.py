@@ -0,0 +1,127 @@
+import time
+from bisect import bisect_left
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Iterable, Iterator, List, Optional, Union
+
+
+def to_timestamp(value: Union[datetime, float, int, None]) -> float:
+    """Convert an aware datetime or a unix time into a unix time, None being now"""
+    if value is None:
+        return time.time()
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+class ScheduleIndex:
+    """The events of a schedule sorted by start time for O(log n) lookups by time
+
+    The index is built once per upstream response (it is the parsed model of the response, see
+    :meth:`utils.lolesports.AsyncLolEsports.schedule_index`) so every command and task reading the same schedule
+    shares it. The start times are the ``timestamp`` of the events, parsed when the events are built.
+
+    Parameters
+    ----------
+    events: `iterable` of `Event`
+        The events of the schedule, in any order
+    """
+    def __init__(self, events: Iterable[Any]):
+        # upstream already sorts its schedules, the stable sort keeps the order of the events starting together
+        self.events: List[Any] = sorted(events, key=attrgetter('timestamp'))
+        self.timestamps: List[float] = [event.timestamp for event in self.events]
+        # the positions of the unstarted events, a match may start late so their start times are searched apart
+        self._unstarted: List[int] = [i for i, event in enumerate(self.events) if event.state == 'unstarted']
+        self._unstarted_timestamps: List[float] = [self.timestamps[i] for i in self._unstarted]
+        self._matches: Optional['ScheduleIndex'] = None
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.events)
+
+    def __getitem__(self, index: int) -> Any:
+        return self.events[index]
+
+    def matches(self) -> 'ScheduleIndex':
+        """Get the index of the match events only (without the shows), built once"""
+        if self._matches is None:
+            self._matches = ScheduleIndex(event for event in self.events if event.type == 'match')
+        return self._matches
+
+    def next_index(self, now: Union[datetime, float, None] = None) -> Optional[int]:
+        """Get the position of the first event starting at or after ``now``, or None if there is none"""
+        index = bisect_left(self.timestamps, to_timestamp(now))
+        return index if index < len(self.events) else None
+
+    def next(self, now: Union[datetime, float, None] = None) -> Optional[Any]:
+        """Get the first event starting at or after ``now``, or None if there is none"""
+        index = self.next_index(now)
+        return None if index is None else self.events[index]
+
+    def closest_index(self, now: Union[datetime, float, None] = None) -> Optional[int]:
+        """Get the position of the event starting the closest to ``now`` (before or after), or None if the index is empty
+
+        Parameters
+        ----------
+        now: `datetime` | `float`
+            The reference time. Defaults to the current time
+
+        Returns
+        -------
+        index: `int`
+            The position of the closest event, the earlier one on a tie
+        ---
+        """
+        if not self.events:
+            return None
+        now = to_timestamp(now)
+        index = bisect_left(self.timestamps, now)
+        if index == len(self.events):
+            return index - 1
+        if index > 0 and now - self.timestamps[index - 1] <= self.timestamps[index] - now:
+            return index - 1
+        return index
+
+    def closest(self, now: Union[datetime, float, None] = None) -> Optional[Any]:
+        """Get the event starting the closest to ``now``, or None if the index is empty"""
+        index = self.closest_index(now)
+        return None if index is None else self.events[index]
+
+    def between(self, since: Union[datetime, float, None] = None, until: Union[datetime, float, None] = None) -> List[Any]:
+        """Get the events starting in [since, until), by start time
+
+        Parameters
+        ----------
+        since: `datetime` | `float`
+            The earliest start time, included. Defaults to the start of the schedule
+        until: `datetime` | `float`
+            The latest start time, excluded. Defaults to the end of the schedule
+
+        Returns
+        -------
+        events: `list` of `Event`
+            The events starting in the range
+        ---
+        """
+        low = 0 if since is None else bisect_left(self.timestamps, to_timestamp(since))
+        high = len(self.events) if until is None else bisect_left(self.timestamps, to_timestamp(until))
+        return self.events[low:high]
+
+    def first_unstarted_index(self, after: Union[datetime, float, None] = None) -> Optional[int]:
+        """Get the position of the first unstarted event, starting at or after ``after`` if given, or None if there is none"""
+        position = 0 if after is None else bisect_left(self._unstarted_timestamps, to_timestamp(after))
+        return self._unstarted[position] if position < len(self._unstarted) else None
+
+    def first_unstarted(self, after: Union[datetime, float, None] = None) -> Optional[Any]:
+        """Get the first unstarted event, starting at or after ``after`` if given, or None if there is none"""
+        index = self.first_unstarted_index(after)
+        return None if index is None else self.events[index]
+
+    def upcoming(self, limit: Optional[int] = None) -> List[Any]:
+        """Get the events from the first unstarted one on, at most ``limit`` of them"""
+        index = self.first_unstarted_index()
+        if index is None:
+            return []
+        return self.events[index:] if limit is None else self.events[index:index + limit]
@@ -0,0 +1,149 @@
+import json
+from typing import Dict, List, Optional, TypedDict
+import msgspec
+
+# The schemas below only declare the fields that the bot reads from the schedule and vod payloads.
+# msgspec skips every other field while parsing the raw bytes instead of materializing it, so the large
+# multi-league responses are decoded faster and the decoded dicts kept in the cache are much smaller.
+# The decoded values keep the same shape as the api, so the rest of the code reads them as plain dicts.
+
+
+class MediaLocale(TypedDict, total=False):
+    locale: str
+    englishName: str
+
+
+class Stream(TypedDict, total=False):
+    parameter: str
+    locale: str
+    provider: str
+    mediaLocale: Optional[MediaLocale]
+
+
+class Vod(TypedDict, total=False):
+    parameter: str
+    locale: str
+    provider: str
+
+
+class Game(TypedDict, total=False):
+    id: str
+    number: int
+    state: str
+    vods: List[Vod]
+
+
+class Result(TypedDict, total=False):
+    outcome: Optional[str]
+    gameWins: int
+
+
+class Record(TypedDict, total=False):
+    wins: int
+    losses: int
+
+
+class Team(TypedDict, total=False):
+    id: str
+    name: str
+    code: str
+    slug: str
+    image: str
+    result: Optional[Result]
+    record: Optional[Record]
+
+
+class Strategy(TypedDict, total=False):
+    type: str
+    count: int
+
+
+class Match(TypedDict, total=False):
+    id: str
+    state: str
+    teams: List[Team]
+    strategy: Optional[Strategy]
+    games: List[Game]
+
+
+class League(TypedDict, total=False):
+    id: str
+    name: str
+    slug: str
+    image: str
+
+
+class Tournament(TypedDict, total=False):
+    id: str
+
+
+class Event(TypedDict, total=False):
+    id: str
+    startTime: str
+    state: str
+    type: str
+    blockName: Optional[str]
+    league: League
+    tournament: Optional[Tournament]
+    match: Optional[Match]
+    games: List[Game]
+    streams: Optional[List[Stream]]
+
+
+class Pages(TypedDict, total=False):
+    older: Optional[str]
+    newer: Optional[str]
+
+
+class Schedule(TypedDict, total=False):
+    pages: Optional[Pages]
+    events: List[Event]
+
+
+class ScheduleData(TypedDict):
+    schedule: Schedule
+
+
+class ScheduleResponse(TypedDict):
+    data: ScheduleData
+
+
+# endpoint -> decoder of its raw body
+DECODERS: Dict[str, msgspec.json.Decoder] = {
+    'getSchedule': msgspec.json.Decoder(ScheduleResponse),
+    'getVods': msgspec.json.Decoder(ScheduleResponse),
+    'getVodsForHome': msgspec.json.Decoder(ScheduleResponse),
+}
+
+
+def decode(endpoint: str, body: bytes) -> dict:
+    """Decode a raw response body, keeping only the fields of the endpoint schema if it has one
+
+    Parameters
+    ----------
+    endpoint: `str`
+        The name of the endpoint
+    body: `bytes`
+        The raw response body
+
+    Returns
+    -------
+    data: `dict`
+        The decoded body
+
+    Raises
+    ------
+    ValueError
+        If the body is not valid json
+    """
+    decoder = DECODERS.get(endpoint)
+    if decoder is None:
+        return json.loads(body)
+    try:
+        return decoder.decode(body)
+    except msgspec.ValidationError as e:
+        # upstream changed the shape of a field, fall back to decoding everything rather than failing
+        print(f'**`ERROR:`** {type(e).__name__} - {endpoint}: {e}')
+        return json.loads(body)
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e
@@ -0,0 +1,209 @@
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from utils.cache import body_digest
+
+
+def match_result(match: Any) -> Optional[Tuple[str, str]]:
+    """Get the (winner code, loser code) of a finished series, or None if it is not decided yet
+
+    The outcome of the teams is used when upstream already set it, otherwise a team that won the majority of a
+    best of N (ex. 3 games of a bo5) is the winner.
+    """
+    if len(match.teams) != 2:
+        return None
+    first, second = match.teams
+    if first.outcome == 'win' or second.outcome == 'loss':
+        return first.code, second.code
+    if second.outcome == 'win' or first.outcome == 'loss':
+        return second.code, first.code
+    if match.strategy_count:
+        needed = match.strategy_count // 2 + 1
+        if first.game_wins >= needed:
+            return first.code, second.code
+        if second.game_wins >= needed:
+            return second.code, first.code
+    return None
+
+
+class TournamentTable:
+    """The live standings of one tournament
+
+    Parameters
+    ----------
+    tournament_id: `int`
+        The id of the tournament
+    standing: `Standing`
+        The upstream standings the table is seeded from
+    counted: `set` of `int`
+        The ids of the matches already counted in the upstream standings
+    """
+    __slots__ = ('tournament_id', 'base', 'records', 'counted', 'pending', 'seeded_at', '_standing')
+
+    def __init__(self, tournament_id: int, standing: Any, counted: Set[int]):
+        self.tournament_id = tournament_id
+        self.base = standing
+        # team code -> [wins, losses, upstream position]
+        self.records: Dict[str, list] = {row.team.code: [row.wins, row.losses, index] for index, row in enumerate(standing.rows)}
+        self.counted = counted
+        # results applied locally that upstream did not count yet: match id -> (winner code, loser code)
+        self.pending: Dict[int, Tuple[str, str]] = {}
+        self.seeded_at = time.monotonic()
+        self._standing = standing
+
+    def apply(self, match_id: int, winner: str, loser: str) -> bool:
+        """Count the result of a series, once
+
+        Returns
+        -------
+        applied: `bool`
+            Whether the result changed the table
+        ---
+        """
+        if match_id in self.counted or match_id in self.pending:
+            return False
+        winner_record, loser_record = self.records.get(winner), self.records.get(loser)
+        if winner_record is None or loser_record is None:
+            return False
+        winner_record[0] += 1
+        loser_record[1] += 1
+        self.pending[match_id] = (winner, loser)
+        self._standing = None
+        return True
+
+    def standing(self) -> Any:
+        """Get the current table as a :class:`utils.lolesports.Standing`, built again only after a change"""
+        if self._standing is None:
+            rows_by_code = {row.team.code: row for row in self.base.rows}
+            # most wins first, then fewest losses, keeping the upstream order (tiebreakers) between equal records
+            order = sorted(self.records.items(), key=lambda item: (-item[1][0], item[1][1], item[1][2]))
+            rows, ordinal, previous = [], 0, None
+            for position, (code, (wins, losses, _)) in enumerate(order, 1):
+                if (wins, losses) != previous:
+                    ordinal, previous = position, (wins, losses)
+                rows.append(replace(rows_by_code[code], ordinal=ordinal, wins=wins, losses=losses))
+            version = body_digest(repr([(row.ordinal, row.team.name, row.team.code, row.wins, row.losses) for row in rows]).encode())
+            self._standing = replace(self.base, rows=rows, version=version)
+        return self._standing
+
+
+class StandingsEngine:
+    """Standings kept up to date with the results seen by the live poller
+
+    A tournament is seeded from its upstream standings and matches. Every finished series observed afterwards is
+    counted right away in O(1) instead of waiting for upstream to update its standings, and the table is rebuilt
+    only when it is read after a change. Tournaments are seeded again every ``reconcile_interval`` seconds; the
+    local results that upstream has not counted yet are applied again on top of the new seed. At most
+    ``max_tournaments`` tables are kept, the least recently read ones (ex. finished tournaments) are dropped first.
+
+    Parameters
+    ----------
+    reconcile_interval: `float`
+        The number of seconds after which a tournament is seeded again from upstream
+    max_tournaments: `int`
+        The largest number of tournaments kept
+    """
+    def __init__(self, reconcile_interval: float = 10 * 60, max_tournaments: int = 64):
+        self.reconcile_interval = reconcile_interval
+        self.max_tournaments = max_tournaments
+        self.tables: 'OrderedDict[int, TournamentTable]' = OrderedDict()
+        # match id -> tournament id of every match of the seeded tournaments
+        self.match_index: Dict[int, int] = {}
+        self._live: Set[int] = set()
+
+    def needs_seed(self, tournament_id: int) -> bool:
+        """Whether the tournament was never seeded or is due for a reconciliation with upstream"""
+        table = self.tables.get(tournament_id)
+        return table is None or time.monotonic() - table.seeded_at >= self.reconcile_interval
+
+    def seed(self, tournament_id: int, standing: Any, matches: Iterable[Any]) -> TournamentTable:
+        """Seed (or reconcile) a tournament from upstream
+
+        Parameters
+        ----------
+        tournament_id: `int`
+            The id of the tournament
+        standing: `Standing`
+            The upstream regular season standings of the tournament
+        matches: `list` of `Match`
+            The upstream matches of the tournament
+
+        Returns
+        -------
+        table: `TournamentTable`
+            The table of the tournament
+        ---
+        """
+        counted = set()
+        for match in matches:
+            self.match_index[match.id] = tournament_id
+            if match.state == 'completed':
+                counted.add(match.id)
+        previous = self.tables.get(tournament_id)
+        table = TournamentTable(tournament_id, standing, counted)
+        if previous is not None:
+            for match_id, (winner, loser) in previous.pending.items():
+                table.apply(match_id, winner, loser)
+        self.tables[tournament_id] = table
+        self.tables.move_to_end(tournament_id)
+        while len(self.tables) > self.max_tournaments:
+            self.evict(next(iter(self.tables)))
+        return table
+
+    def evict(self, tournament_id: int) -> None:
+        """Drop the table and the matches of a tournament"""
+        if self.tables.pop(tournament_id, None) is None:
+            return
+        self.match_index = {match_id: _id for match_id, _id in self.match_index.items() if _id != tournament_id}
+        self._live = {match_id for match_id in self._live if match_id in self.match_index}
+
+    def observe(self, match: Any) -> bool:
+        """Count the result of a match of a seeded tournament if the series is over
+
+        Parameters
+        ----------
+        match: `Match`
+            A match seen live or in the details of an event
+
+        Returns
+        -------
+        applied: `bool`
+            Whether the result changed a table
+        ---
+        """
+        tournament_id = self.match_index.get(match.id)
+        if tournament_id is None:
+            return False
+        result = match_result(match)
+        if result is None:
+            return False
+        return self.tables[tournament_id].apply(match.id, *result)
+
+    def track_live(self, match_ids: Iterable[int]) -> List[int]:
+        """Record the ids of the matches live right now
+
+        Returns
+        -------
+        ended: `list` of `int`
+            The ids of the tracked matches that were live at the previous poll and are not anymore, whose final
+            result should be fetched and observed
+        ---
+        """
+        live = {match_id for match_id in match_ids if match_id in self.match_index}
+        ended = [match_id for match_id in self._live - live
+                 if not self._is_counted(match_id)]
+        self._live = live
+        return ended
+
+    def _is_counted(self, match_id: int) -> bool:
+        table = self.tables.get(self.match_index.get(match_id))
+        return table is not None and (match_id in table.counted or match_id in table.pending)
+
+    def standing(self, tournament_id: int) -> Optional[Any]:
+        """Get the current standings of a seeded tournament, or None if it was never seeded"""
+        table = self.tables.get(tournament_id)
+        if table is None:
+            return None
+        self.tables.move_to_end(tournament_id)
+        return table.standing()
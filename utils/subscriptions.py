@@ -0,0 +1,345 @@
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+
+@dataclass
+class Subscription:
+    """The live notifications followed by a channel
+
+    A channel following no league and no team gets the notifications of every event
+    """
+    __slots__ = ('channel_id', 'guild_id', 'leagues', 'teams')
+    channel_id: int
+    guild_id: Optional[int]
+    leagues: frozenset
+    teams: frozenset
+
+    @property
+    def follows_everything(self) -> bool:
+        return not self.leagues and not self.teams
+
+
+def league_key(league: Any) -> Optional[str]:
+    """Get the key a league is followed by: its slug (ex. lck, worlds)"""
+    return (league.slug or league.name or '').lower() or None
+
+
+def event_keys(event: Any) -> tuple:
+    """Get the (league key, team codes) of an event"""
+    teams = [team.code.upper() for team in event.match.teams if team.code] if event.match is not None else []
+    return league_key(event.league), teams
+
+
+class SubscriptionStore:
+    """The channels subscribed to the live notifications, persisted in SQLite and indexed by league and team
+
+    The subscriptions are loaded once and kept in memory along with an index of the channels by followed league and
+    by followed team, so the channels to notify of an event are a few set lookups whatever the number of servers.
+    The changes update the memory right away and are written by a writer thread, like
+    :class:`utils.cache.PersistentStore`, so the commands never wait on a commit on the event loop.
+
+    Parameters
+    ----------
+    path: `str`
+        The path of the SQLite database file
+    """
+    def __init__(self, path: str):
+        self.path = path
+        # whether the database did not exist yet, to seed the default subscriptions only once
+        self.created = not os.path.exists(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._queue: 'queue.Queue[Optional[tuple]]' = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self.subscriptions: Dict[int, Subscription] = {}
+        self._by_league: Dict[str, Set[int]] = {}
+        self._by_team: Dict[str, Set[int]] = {}
+        self._everything: Set[int] = set()
+        self.load()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS subscriptions ('
+                'channel_id INTEGER PRIMARY KEY, guild_id INTEGER, leagues TEXT NOT NULL, teams TEXT NOT NULL)'
+            )
+        return self._conn
+
+    def _enqueue(self, statement: str, params: tuple) -> None:
+        """Queue a write for the writer thread, starting it if needed"""
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name='subscription-store-writer', daemon=True)
+            self._writer.start()
+        self._queue.put((statement, params))
+
+    def _write_loop(self) -> None:
+        """Execute the queued writes, committing whatever is queued at once, until :meth:`close` queues None"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # put the stop back for the outer loop once the batch is committed
+                    self._queue.task_done()
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            try:
+                with self._lock:
+                    conn = self._connect()
+                    for statement, params in batch:
+                        conn.execute(statement, params)
+                    conn.commit()
+            except sqlite3.Error as e:
+                print(f'**`ERROR:`** {type(e).__name__} - {e}')
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self) -> None:
+        """Wait until every queued write is committed"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.join()
+
+    def load(self) -> int:
+        """Load the stored subscriptions into memory, returns their number"""
+        with self._lock:
+            rows = self._connect().execute('SELECT channel_id, guild_id, leagues, teams FROM subscriptions').fetchall()
+        for channel_id, guild_id, leagues, teams in rows:
+            self._index(Subscription(channel_id, guild_id, frozenset(filter(None, leagues.split(','))),
+                                     frozenset(filter(None, teams.split(',')))))
+        return len(rows)
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def get(self, channel_id: int) -> Optional[Subscription]:
+        return self.subscriptions.get(channel_id)
+
+    def _index(self, subscription: Subscription) -> None:
+        self._unindex(subscription.channel_id)
+        self.subscriptions[subscription.channel_id] = subscription
+        if subscription.follows_everything:
+            self._everything.add(subscription.channel_id)
+        for league in subscription.leagues:
+            self._by_league.setdefault(league, set()).add(subscription.channel_id)
+        for team in subscription.teams:
+            self._by_team.setdefault(team, set()).add(subscription.channel_id)
+
+    def _unindex(self, channel_id: int) -> Optional[Subscription]:
+        subscription = self.subscriptions.pop(channel_id, None)
+        if subscription is not None:
+            self._everything.discard(channel_id)
+            for index, keys in ((self._by_league, subscription.leagues), (self._by_team, subscription.teams)):
+                for key in keys:
+                    channels = index.get(key)
+                    if channels is not None:
+                        channels.discard(channel_id)
+                        if not channels:
+                            del index[key]
+        return subscription
+
+    def subscribe(self, channel_id: int, guild_id: Optional[int] = None, leagues: Iterable[str] = (),
+                  teams: Iterable[str] = ()) -> Subscription:
+        """Add leagues and teams to the subscription of a channel, creating it if needed
+
+        Parameters
+        ----------
+        channel_id: `int`
+            The id of the channel to notify
+        guild_id: `int`
+            The id of the server of the channel
+        leagues: `iterable` of `str`
+            The slugs of the leagues to follow (ex. lck, worlds)
+        teams: `iterable` of `str`
+            The codes of the teams to follow (ex. T1, G2)
+
+        Returns
+        -------
+        subscription: `Subscription`
+            The updated subscription of the channel
+        ---
+        """
+        previous = self.subscriptions.get(channel_id)
+        subscription = Subscription(
+            channel_id,
+            guild_id if guild_id is not None else previous.guild_id if previous else None,
+            frozenset(league.lower() for league in leagues) | (previous.leagues if previous else frozenset()),
+            frozenset(team.upper() for team in teams) | (previous.teams if previous else frozenset()),
+        )
+        self._save(subscription)
+        return subscription
+
+    def unfollow(self, channel_id: int, leagues: Iterable[str] = (), teams: Iterable[str] = ()) -> Optional[Subscription]:
+        """Remove leagues and teams from the subscription of a channel
+
+        A channel left following nothing is unsubscribed rather than following every event.
+
+        Parameters
+        ----------
+        channel_id: `int`
+            The id of the notified channel
+        leagues: `iterable` of `str`
+            The slugs of the leagues to stop following
+        teams: `iterable` of `str`
+            The codes of the teams to stop following
+
+        Returns
+        -------
+        subscription: `Subscription`
+            The updated subscription of the channel, None if the channel is not subscribed anymore
+        ---
+        """
+        previous = self.subscriptions.get(channel_id)
+        if previous is None:
+            return None
+        subscription = Subscription(
+            channel_id,
+            previous.guild_id,
+            previous.leagues - {league.lower() for league in leagues},
+            previous.teams - {team.upper() for team in teams},
+        )
+        if subscription.follows_everything and not previous.follows_everything:
+            self.unsubscribe(channel_id)
+            return None
+        self._save(subscription)
+        return subscription
+
+    def _save(self, subscription: Subscription) -> None:
+        self._enqueue(
+            'INSERT OR REPLACE INTO subscriptions (channel_id, guild_id, leagues, teams) VALUES (?, ?, ?, ?)',
+            (subscription.channel_id, subscription.guild_id, ','.join(sorted(subscription.leagues)), ','.join(sorted(subscription.teams)))
+        )
+        self._index(subscription)
+
+    def unsubscribe(self, channel_id: int) -> Optional[Subscription]:
+        """Remove the subscription of a channel, returns it or None if the channel was not subscribed"""
+        self._enqueue('DELETE FROM subscriptions WHERE channel_id = ?', (channel_id,))
+        return self._unindex(channel_id)
+
+    def channels_for(self, league: Optional[str] = None, teams: Iterable[str] = ()) -> Set[int]:
+        """Get the ids of the channels following a league or any of the teams, or following everything"""
+        channels = set(self._everything)
+        if league is not None:
+            channels |= self._by_league.get(league, set())
+        for team in teams:
+            channels |= self._by_team.get(team, set())
+        return channels
+
+    def close(self) -> None:
+        """Commit the queued writes, stop the writer thread and close the database connection"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._writer = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def merge_messages(messages: List[dict], max_embeds: int = 10, max_length: int = 2000, max_embed_length: int = 6000) -> List[dict]:
+    """Merge the messages of a channel into as few messages as discord allows
+
+    A message holds at most 10 embeds, 2000 characters of content and 6000 characters across all of its embeds.
+    """
+    merged: List[dict] = []
+    for message in messages:
+        content, embeds = message.get('content'), message.get('embeds') or []
+        last = merged[-1] if merged else None
+        if (last is not None and len(last['embeds']) + len(embeds) <= max_embeds
+                and len(last['content'] or '') + len(content or '') + 1 <= max_length
+                and sum(map(len, last['embeds'])) + sum(map(len, embeds)) <= max_embed_length):
+            if content:
+                last['content'] = f"{last['content']}\n{content}" if last['content'] else content
+            last['embeds'] = last['embeds'] + embeds
+        else:
+            merged.append({'content': content, 'embeds': list(embeds)})
+    return merged
+
+
+class FanOutDispatcher:
+    """Delivers the live notifications to every subscribed channel
+
+    Every message is rendered once per transition, whatever the number of channels it goes to. The messages of a
+    poll are grouped by channel and merged so that a channel gets one message per poll most of the time, which
+    keeps every channel well under the rate limit of its message route. The channels are then sent to concurrently
+    in batches of ``batch_size`` per ``batch_interval`` seconds to stay under the global rate limit of the bot.
+
+    Parameters
+    ----------
+    store: `SubscriptionStore`
+        The subscriptions
+    render: `Callable`
+        A function building the message (the keyword arguments of ``send``) of a transition, or None to skip it
+    send: `Callable`
+        A coroutine function sending a message to a channel id
+    batch_size: `int`
+        The number of channels sent to at once
+    batch_interval: `float`
+        The smallest number of seconds between the start of two batches
+    """
+    def __init__(self, store: SubscriptionStore, render: Callable[[Any], Optional[dict]],
+                 send: Callable[[int, dict], Awaitable[Any]], batch_size: int = 40, batch_interval: float = 1.0):
+        self.store = store
+        self.render = render
+        self.send = send
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+
+    async def dispatch(self, transitions: List[Any]) -> int:
+        """Send the transitions of a poll to the channels following their events, returns the number of messages sent"""
+        outbox: Dict[int, List[dict]] = {}
+        for transition in transitions:
+            message = self.render(transition)
+            if message is None:
+                continue
+            league, teams = event_keys(transition.event)
+            for channel_id in self.store.channels_for(league, teams):
+                outbox.setdefault(channel_id, []).append(message)
+        return await self.deliver(outbox)
+
+    async def broadcast(self, message: dict, events: Iterable[Any]) -> int:
+        """Send a message to the channels following any of the events, returns the number of messages sent"""
+        channels: Set[int] = set()
+        for event in events:
+            league, teams = event_keys(event)
+            channels |= self.store.channels_for(league, teams)
+        return await self.deliver({channel_id: [message] for channel_id in channels})
+
+    async def deliver(self, outbox: Dict[int, List[dict]]) -> int:
+        """Send the messages of each channel, the channels in concurrent batches"""
+        async def send_all(channel_id: int, messages: List[dict]) -> int:
+            sent = 0
+            for message in merge_messages(messages):
+                try:
+                    await self.send(channel_id, message)
+                    sent += 1
+                except Exception as e:
+                    print(f'**`ERROR:`** {type(e).__name__} - {e}')
+            return sent
+
+        items = list(outbox.items())
+        sent = 0
+        for i in range(0, len(items), self.batch_size):
+            started = time.monotonic()
+            sent += sum(await asyncio.gather(*(send_all(channel_id, messages) for channel_id, messages in items[i:i + self.batch_size])))
+            if i + self.batch_size < len(items):
+                await asyncio.sleep(max(self.batch_interval - (time.monotonic() - started), 0))
+        return sent
@@ -0,0 +1,231 @@
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class TeamEntry:
+    """A team known to the :class:`TeamRegistry`"""
+    __slots__ = ('code', 'slug', 'name', 'image', 'league', 'active')
+    code: str
+    slug: str
+    name: str
+    image: Optional[str]
+    league: Optional[str]
+    active: bool
+
+    @classmethod
+    def from_dict(cls, team: dict) -> 'TeamEntry':
+        """Build the entry of a team of the getTeams response"""
+        home_league = team.get('homeLeague') or {}
+        return cls(sys.intern(team.get('code') or ''), sys.intern(team['slug']), team.get('name') or team['slug'],
+                   team.get('image'), home_league.get('name'), team.get('status', 'active') == 'active')
+
+
+def normalize(text: str) -> str:
+    """Lowercase a search key and collapse its separators"""
+    return ' '.join(text.lower().replace('-', ' ').split())
+
+
+# rank of a key by the field it comes from; a lower rank is listed first
+CODE, SLUG, NAME, WORD = range(4)
+
+
+class _Node:
+    __slots__ = ('children', 'terminal', 'top')
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        # the ranks of the keys ending here
+        self.terminal: List[int] = []
+        # the best ranks of the subtree with one rank per entry, filled once the trie is built
+        self.top: List[int] = []
+
+
+class TeamRegistry:
+    """An index of the teams of every league for instant ranked lookups
+
+    Every team is indexed by its code, its slug, its name and each word of its name in a prefix trie. Every node
+    keeps the ``limit`` best ranked entries of its subtree, so a prefix lookup costs one walk down the trie no matter
+    how many teams share the prefix. Queries without a prefix match fall back to a bounded edit distance search of the
+    same trie, which catches typos such as ``fanatic`` or ``geng``.
+
+    Parameters
+    ----------
+    teams: `iterable` of `TeamEntry`
+        The initial teams
+    limit: `int`
+        The largest number of results of a lookup (discord shows at most 25 autocomplete choices)
+    """
+    def __init__(self, teams: Iterable[TeamEntry] = (), limit: int = 25):
+        self.limit = limit
+        self.entries: List[TeamEntry] = []
+        self.updated_at: Optional[float] = None
+        self._root = _Node()
+        self._owners: List[int] = []
+        self._exact: Dict[str, int] = {}
+        self.update(teams)
+
+    @classmethod
+    def from_mapping(cls, teams: Dict[str, str]) -> 'TeamRegistry':
+        """Build a registry from a mapping of team code to team slug like :data:`utils.constants.MAJOR_TEAMS`"""
+        return cls(TeamEntry(sys.intern(code.upper()), sys.intern(slug), slug.replace('-', ' ').title(), None, None, True)
+                   for code, slug in teams.items())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def update(self, teams: Iterable[TeamEntry]) -> None:
+        """Replace the indexed teams and rebuild the trie
+
+        Parameters
+        ----------
+        teams: `iterable` of `TeamEntry`
+            The teams to index; a later team with an already indexed slug is skipped
+        ---
+        """
+        entries, seen = [], set()
+        for team in teams:
+            if team.slug not in seen:
+                seen.add(team.slug)
+                entries.append(team)
+        # rank every key once so that the trie only compares integers: active teams first, then the code over the
+        # slug over the name, then the shorter key as it matches the typed prefix more closely
+        keys = sorted((not team.active, field, len(key), team.code, index, key)
+                      for index, team in enumerate(entries) for key, field in self._keys(team))
+        owners = [record[4] for record in keys]
+        root, exact = _Node(), {}
+        for rank, record in enumerate(keys):
+            key = record[5]
+            node = root
+            for char in key:
+                node = node.children.setdefault(char, _Node())
+            node.terminal.append(rank)
+            exact.setdefault(key, owners[rank])
+        self._collect_top(root, owners)
+        self.entries = entries
+        self._owners = owners
+        self._root = root
+        self._exact = exact
+        self.updated_at = time.monotonic()
+
+    @staticmethod
+    def _keys(team: TeamEntry) -> Iterable[tuple]:
+        """The (key, field rank) pairs a team is indexed by"""
+        keys = {}
+        name = normalize(team.name)
+        for key, field in ((normalize(team.code), CODE), (normalize(team.slug), SLUG), (name, NAME)):
+            keys.setdefault(key, field)
+        for word in name.split()[1:]:
+            if len(word) > 1:
+                keys.setdefault(word, WORD)
+        keys.pop('', None)
+        return keys.items()
+
+    def _collect_top(self, root: _Node, owners: List[int]) -> None:
+        """Fill the ``top`` list of every node bottom-up"""
+        # iterative post-order walk, the trie can be deeper than the recursion limit allows
+        stack, order = [root], []
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(node.children.values())
+        for node in reversed(order):
+            if not node.terminal and len(node.children) == 1:
+                # most nodes are links of a single key, share the list of the child
+                node.top = next(iter(node.children.values())).top
+                continue
+            ranks = [rank for child in node.children.values() for rank in child.top]
+            ranks.extend(node.terminal)
+            ranks.sort()
+            top, seen = [], set()
+            for rank in ranks:
+                if owners[rank] not in seen:
+                    seen.add(owners[rank])
+                    top.append(rank)
+                    if len(top) == self.limit:
+                        break
+            node.top = top
+
+    def get(self, query: str) -> Optional[TeamEntry]:
+        """Get the team whose code, slug or name is exactly the query (case insensitive)
+
+        Parameters
+        ----------
+        query: `str`
+            The code, slug or name of the team
+
+        Returns
+        -------
+        team: `TeamEntry`
+            The team, or None if no team matches
+        ---
+        """
+        index = self._exact.get(normalize(query))
+        return None if index is None else self.entries[index]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[TeamEntry]:
+        """Get the teams matching a query, best match first
+
+        Exact matches come first, then the teams with a key starting with the query and finally, if there is still room,
+        the teams with a key within a small edit distance of the query.
+
+        Parameters
+        ----------
+        query: `str`
+            What the user typed so far
+        limit: `int`
+            The largest number of teams to return. Defaults to the limit of the registry
+
+        Returns
+        -------
+        teams: `list` of `TeamEntry`
+            The matching teams
+        ---
+        """
+        limit = self.limit if limit is None else min(limit, self.limit)
+        key = normalize(query)
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                break
+        indexes = []
+        exact = self._exact.get(key)
+        if exact is not None:
+            indexes.append(exact)
+        if node is not None:
+            indexes.extend(self._owners[rank] for rank in node.top if self._owners[rank] != exact)
+        if len(indexes) < limit and len(key) >= 3:
+            seen = set(indexes)
+            indexes.extend(index for index in self._fuzzy(key, 1 if len(key) < 8 else 2) if index not in seen)
+        return [self.entries[index] for index in indexes[:limit]]
+
+    def _fuzzy(self, key: str, max_distance: int, budget: int = 1000) -> List[int]:
+        """Get the entries with a key within ``max_distance`` edits of the query, closest first
+
+        Walks the trie below the first letter of the query (typos rarely hit the first letter) with one row of
+        the levenshtein matrix per node, pruning every branch whose row is already past ``max_distance``. At most
+        ``budget`` nodes are visited so that a query under a very crowded prefix stays as fast as the others.
+        """
+        start = self._root.children.get(key[0])
+        if start is None:
+            return []
+        found = {}
+        stack = [(start, list(range(len(key))))]
+        key = key[1:]
+        while stack and budget > 0:
+            node, previous = stack.pop()
+            if previous[-1] <= max_distance:
+                for rank in node.terminal:
+                    owner = self._owners[rank]
+                    found[owner] = min(found.get(owner, (max_distance + 1,)), (previous[-1], rank))
+            for char, child in node.children.items():
+                budget -= 1
+                row = [previous[0] + 1]
+                for column, key_char in enumerate(key, 1):
+                    row.append(min(row[column - 1] + 1, previous[column] + 1, previous[column - 1] + (key_char != char)))
+                if min(row) <= max_distance:
+                    stack.append((child, row))
+        return sorted(found, key=found.get)